@@ -1,20 +1,43 @@
 import json
 import logging
 import io
-import os
-from datetime import datetime, timedelta
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
 from dotenv import load_dotenv
 import pytz
 
 # --- IMPORTS INTERNES ---
-from src.config import ACTIVE_BATCHES, API_KEY, BASE_URL
+from src.config import (
+    ACTIVE_BATCHES,
+    API_BULK_FETCH,
+    API_MAX_COMPETITIONS_PER_REQUEST,
+    API_MAX_DAYS_PER_REQUEST,
+    BACKFILL_WORKERS,
+    DRIVE_UPLOAD_WORKERS,
+    FETCH_MAX_WORKERS,
+    LAYOUT_MODE,
+    PIPELINE_QUEUE_SIZE,
+    RENDER_WORKERS
+)
 from src.leagues import LEAGUES
-from src.api_client import get_matches
-from src.generate_image import generate_image
+from src.api_client import get_matches, get_matches_bulk, get_cache_stats
+from src.generate_image import (
+    PagePacker,
+    PageRenderer,
+    iter_blocks,
+    page_extension,
+    page_hash,
+    page_mimetype,
+    prefetch_logos,
+    text_cache_stats
+)
+from src.pipeline import Pipeline, Stage
+from src.page_manifest import PageManifest
 from src.drive_uploader import (
     upload_json_bytes,
     upload_png_bytes,
-    drive_find_file_id,
+    get_folder_index,
     download_json_bytes_by_id
 )
 
@@ -46,6 +69,9 @@ LOGS_FOLDER_ID = "1L4GlV7oib27QkzHQtHBm5Pbma7vf9Vc9"
 # Charger .env
 load_dotenv()
 
+# Les journées (noms de fichiers) sont en heure de Paris
+PARIS = pytz.timezone("Europe/Paris")
+
 # ---------------------------------------------------------
 # UTILITAIRE : Sélection des ligues selon les batchs actifs
 # ---------------------------------------------------------
@@ -56,51 +82,203 @@ def get_leagues_for_active_batches():
     ]
 
 # ---------------------------------------------------------
-# MAIN PIPELINE
+# UTILITAIRE : Extraction concurrente des ligues
 # ---------------------------------------------------------
-if __name__ == "__main__":
+def fetch_leagues(leagues, date_str, max_workers=FETCH_MAX_WORKERS, bulk=API_BULK_FETCH,
+                  date_to=None):
+    """
+    Récupère les matchs de plusieurs ligues (du `date_str` au `date_to` inclus).
+    - bulk : requêtes groupées /matches?competitions=… d'abord
+    - ligues restantes (ou bulk désactivé) : une requête par ligue,
+      max_workers requêtes simultanées au maximum
+    - le dict retourné conserve l'ordre de `leagues`
+    - les ligues sans match (ou en erreur) sont ignorées
+    """
 
-    print("=== 🚀 DÉMARRAGE DU PIPELINE FOOTBALL ===")
-    log.info("Pipeline démarré.")
+    datas = {}
 
-    # ---------------------------------------------------------
-    # Gestion du fuseau horaire France (Europe/Paris)
-    # ---------------------------------------------------------
-    paris = pytz.timezone("Europe/Paris")
+    if bulk and leagues:
+        codes = [league["code"] for league in leagues]
+        print(f"⚽ Extraction groupée {codes}…")
+        log.info(f"Extraction groupée {codes}")
 
-    now_paris = datetime.now(paris)
-    target_date = now_paris - timedelta(days=1)
-    date_str = target_date.strftime("%Y-%m-%d")
-    timestamp = now_paris.strftime("%Y-%m-%d_%H-%M-%S")
+        datas = get_matches_bulk(codes, date_str, date_to)
 
-    json_filename = f"results_{date_str}.json"
+    remaining = [league for league in leagues if league["code"] not in datas]
 
-    print(f"Heure locale France : {now_paris.strftime('%Y-%m-%d %H:%M:%S')}")
-    print(f"Date ciblée : {date_str}")
+    def fetch_one(league):
+        code = league["code"]
+        name = league["name"]
 
-    log.info(f"Heure locale France : {now_paris.strftime('%Y-%m-%d %H:%M:%S')}")
-    log.info(f"Date ciblée : {date_str}")
+        print(f"⚽ Extraction {name} ({code})…")
+        log.info(f"Extraction {name} ({code})")
+
+        return get_matches(code, date_str, date_to=date_to)
+
+    if remaining:
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            # map() rend les résultats dans l'ordre de soumission
+            for league, data in zip(remaining, executor.map(fetch_one, remaining)):
+                datas[league["code"]] = data
+
+    resultat = {}
+
+    for league in leagues:
+        code = league["code"]
+        data = datas.get(code)
+
+        if data:
+            # 🔥 Injection du nom officiel pour l'affichage dans generate_image()
+            data["name"] = league["name"]
+            resultat[code] = data
+        else:
+            print(f"[INFO] Aucun match ou erreur pour {code}")
+            log.info(f"Aucun match ou erreur pour {code}")
+
+    return resultat
+
+# ---------------------------------------------------------
+# UTILITAIRE : Extraction sur une plage de dates (backfill)
+# ---------------------------------------------------------
+def date_windows(date_from, date_to, max_days=API_MAX_DAYS_PER_REQUEST):
+    """Découpe [date_from, date_to] en fenêtres d'au plus max_days jours."""
+    windows = []
+    start = date_from
+
+    while start <= date_to:
+        end = min(date_to, start + timedelta(days=max(1, max_days) - 1))
+        windows.append((start, end))
+        start = end + timedelta(days=1)
+
+    return windows
+
+def match_local_day(match):
+    """Journée (heure de Paris) d'un match, d'après son utcDate."""
+    utc_date = match.get("utcDate")
+    if not utc_date:
+        return None
+
+    kickoff = datetime.fromisoformat(utc_date.replace("Z", "+00:00"))
+    return kickoff.astimezone(PARIS).strftime("%Y-%m-%d")
+
+def split_local_days(resultat, days, per_day=None):
+    """
+    Répartit les matchs de `resultat` (extraction sur une plage UTC) par
+    journée à l'heure de Paris : {jour: resultat du jour} pour chaque jour
+    de `days`, les autres matchs sont ignorés.
+    - chaque ligue extraite a son entrée, même sans match ce jour-là
+    - per_day : accumulateur à compléter (plusieurs fenêtres d'extraction)
+    """
+
+    if per_day is None:
+        per_day = {day: {} for day in days}
+
+    for code, data in resultat.items():
+        for day in days:
+            per_day[day].setdefault(code, {
+                "competition": data.get("competition", {}),
+                "matches": [],
+                "name": data["name"],
+            })
+
+        for match in data.get("matches", []):
+            day = match_local_day(match)
+            if day in per_day:
+                per_day[day][code]["matches"].append(match)
+
+    return per_day
+
+def fetch_day(leagues, date_str, max_workers=FETCH_MAX_WORKERS):
+    """
+    Récupère la journée `date_str` (heure de Paris, comme le backfill) :
+    un match à 0h30 (Paris) le jour J est daté J-1 en UTC, donc extraction
+    J-1 → J puis filtrage par match_local_day().
+    """
+
+    day_before = (date.fromisoformat(date_str) - timedelta(days=1)).isoformat()
+    resultat = fetch_leagues(leagues, day_before, max_workers=max_workers, date_to=date_str)
+    return split_local_days(resultat, [date_str])[date_str]
+
+def fetch_range(leagues, days):
+    """
+    Récupère toutes les journées `days` (YYYY-MM-DD, heure de Paris) en une
+    requête par fenêtre de API_MAX_DAYS_PER_REQUEST jours, puis redécoupe :
+    {jour: resultat du jour}, même forme que fetch_day().
+    """
+
+    first = date.fromisoformat(min(days))
+    last = date.fromisoformat(max(days))
+
+    # Un match à 0h30 (Paris) le jour J est daté J-1 en UTC
+    windows = date_windows(first - timedelta(days=1), last)
+
+    per_day = {day: {} for day in days}
+
+    for window_from, window_to in windows:
+        print(f"📆 Extraction du {window_from} au {window_to}…")
+        log.info(f"Extraction de la plage {window_from} → {window_to}")
+
+        resultat = fetch_leagues(
+            leagues, window_from.isoformat(), date_to=window_to.isoformat()
+        )
+        split_local_days(resultat, days, per_day)
+
+    # Ordre des ligues identique à un run quotidien
+    order = [league["code"] for league in leagues]
+    return {
+        day: {code: resultat[code] for code in order if code in resultat}
+        for day, resultat in per_day.items()
+    }
+
+# ---------------------------------------------------------
+# PIPELINE D'UNE JOURNÉE
+# ---------------------------------------------------------
+def run_day(date_str, batch_number, resultat=None, render_workers=RENDER_WORKERS):
+    """
+    JSON → pages → Drive pour une journée, en pipeline :
+    fetch → layout → render → upload, reliés par des files bornées.
+    - resultat fourni (backfill) : uploadé tel quel, sans extraction
+    - sinon : JSON Drive existant, ou extraction API
+    Un run interrompu reprend via le manifeste de la journée : ligues déjà
+    extraites non redemandées, pages déjà uploadées ni rendues ni renvoyées.
+    Pendant qu'une ligue est extraite, les précédentes sont mises en page,
+    rendues et uploadées sous un nom provisoire (le total de pages n'est pas
+    encore connu) ; un renommage groupé donne ensuite les noms pageX-Y.
+    """
+
+    json_filename = f"results_{date_str}.json"
+    upload_json = True
 
     # ---------------------------------------------------------
     # 1) Vérification stricte par ID
     # ---------------------------------------------------------
-    print("✔ Vérification du JSON dans Google Drive…")
-    log.info("Recherche stricte du JSON dans Drive.")
+    if resultat is None:
+        print(f"✔ Vérification du JSON {date_str} dans Google Drive…")
+        log.info(f"Recherche stricte du JSON {json_filename} dans Drive.")
 
-    file_id = drive_find_file_id(json_filename, JSON_FOLDER_ID)
+        # Listing unique du dossier JSON, puis recherche en mémoire
+        file_id = get_folder_index(JSON_FOLDER_ID).find_id(json_filename)
 
-    if file_id:
-        print(f"✔ Le fichier {json_filename} existe dans le dossier JSON.")
-        print("→ Téléchargement du JSON pour générer les PNG…")
-        log.info(f"JSON trouvé (ID={file_id}), téléchargement en cours.")
+        if file_id:
+            print(f"✔ Le fichier {json_filename} existe dans le dossier JSON.")
+            print("→ Téléchargement du JSON pour générer les PNG…")
+            log.info(f"JSON trouvé (ID={file_id}), téléchargement en cours.")
 
-        json_bytes = download_json_bytes_by_id(file_id)
-        resultat = json.loads(json_bytes.decode("utf-8"))
+            json_bytes = download_json_bytes_by_id(file_id)
+            resultat = json.loads(json_bytes.decode("utf-8"))
+            upload_json = False
 
-        print("📥 JSON téléchargé depuis Drive.")
-        log.info("JSON téléchargé depuis Drive.")
+            print("📥 JSON téléchargé depuis Drive.")
+            log.info("JSON téléchargé depuis Drive.")
 
-    else:
+    # Point de reprise : ligues déjà extraites, pages déjà publiées
+    manifest = PageManifest.load(
+        f"pages_{date_str}_batch{batch_number}.json", JSON_FOLDER_ID, PNG_FOLDER_ID
+    )
+
+    stages = []
+
+    if resultat is None:
         print("❌ JSON absent dans Google Drive → extraction API…")
         log.info("JSON absent dans Drive, extraction API en cours.")
 
@@ -112,65 +290,249 @@ if __name__ == "__main__":
 
         leagues_to_process = get_leagues_for_active_batches()
 
-        # Récupération du batch utilisé (si plusieurs, on prend le premier)
-        batch_number = ACTIVE_BATCHES[0] if ACTIVE_BATCHES else "X"
-
         print(f"→ Ligues à traiter : {[l['code'] for l in leagues_to_process]}")
         log.info(f"Ligues à traiter : {[l['code'] for l in leagues_to_process]}")
 
-        resultat = {}
+        # Bulk : une requête par groupe de ligues ; sinon une par ligue
+        group_size = max(1, API_MAX_COMPETITIONS_PER_REQUEST) if API_BULK_FETCH else 1
+        items = [
+            leagues_to_process[i:i + group_size]
+            for i in range(0, len(leagues_to_process), group_size)
+        ]
+
+        resumed = [l["code"] for l in leagues_to_process if l["code"] in manifest.leagues]
+        if resumed:
+            print(f"↻ Reprise : {len(resumed)} ligue(s) déjà extraite(s).")
+            log.info(f"Reprise, ligues déjà extraites : {resumed}")
+
+        def fetch(group):
+            todo = [l for l in group if l["code"] not in manifest.leagues]
+            # Groupe bulk en échec : repli ligue par ligue, toujours concurrent
+            # (le limiteur partagé borne le débit réel vers l'API)
+            fetched = fetch_day(todo, date_str, max_workers=FETCH_MAX_WORKERS) if todo else {}
+
+            if fetched:
+                manifest.record_leagues(fetched)
+                manifest.checkpoint()
+
+            chunk = {}
+            for league in group:
+                data = fetched.get(league["code"]) or manifest.leagues.get(league["code"])
+                if data:
+                    chunk[league["code"]] = data
+            return chunk
+
+        log.info(f"Extraction concurrente : {FETCH_MAX_WORKERS} requêtes simultanées max.")
+        stages.append(Stage("fetch", fetch, workers=FETCH_MAX_WORKERS))
+    else:
+        items = [{code: data} for code, data in resultat.items()]
 
-        for league in leagues_to_process:
-            code = league["code"]
-            name = league["name"]
+    # ---------------------------------------------------------
+    # 2) Mise en page au fil de l'extraction (ordre des ligues conservé)
+    # ---------------------------------------------------------
+    merged = {}
+    packer = PagePacker(date_str, mode=LAYOUT_MODE)
+    laid_out = {"pages": 0, "total": None}
 
-            print(f"⚽ Extraction {name} ({code})…")
-            log.info(f"Extraction {name} ({code})")
+    def layout(chunk):
+        merged.update(chunk)
 
-            data = get_matches(code, date_str)
+        # Logos du lot téléchargés en parallèle, une fois : le rendu (et
+        # l'empreinte des pages) les trouve en cache sans attendre le CDN
+        prefetch_logos(chunk)
 
-            if data:
-                # 🔥 Injection du nom officiel pour l'affichage dans generate_image()
-                data["name"] = name
-                resultat[code] = data
-            else:
-                print(f"[INFO] Aucun match ou erreur pour {code}")
-                log.info(f"Aucun match ou erreur pour {code}")
+        for block in iter_blocks(chunk):
+            for page in packer.add(block):
+                laid_out["pages"] += 1
+                yield laid_out["pages"], page
 
-        # Upload JSON
-        json_bytes = json.dumps(resultat, indent=4, ensure_ascii=False).encode("utf-8")
-        upload_json_bytes(json_bytes, json_filename, JSON_FOLDER_ID)
+    def finish_layout():
+        if upload_json:
+            # Upload JSON (toutes les ligues sont extraites)
+            cache_stats = get_cache_stats()
+            if cache_stats:
+                print(f"🗄 Cache API : {cache_stats}")
+                log.info(f"Cache API : {cache_stats}")
 
-        print("✔ JSON uploadé dans Google Drive.")
-        log.info("JSON uploadé dans Drive.")
+            json_bytes = json.dumps(merged, indent=4, ensure_ascii=False).encode("utf-8")
+            upload_json_bytes(json_bytes, json_filename, JSON_FOLDER_ID, upsert=True)
 
-    # ---------------------------------------------------------
-    # 2) Génération des PNG
-    # ---------------------------------------------------------
-    print("🖼 Génération des images PNG…")
-    log.info("Début de la génération des PNG.")
+            print(f"✔ JSON {json_filename} uploadé dans Google Drive.")
+            log.info(f"JSON {json_filename} uploadé dans Drive.")
 
-    png_files = generate_image(resultat, date_str)
+            # Étape terminée : le JSON fait foi, le point de reprise s'allège
+            manifest.clear_leagues()
+            manifest.save()
 
-    print(f"✔ {len(png_files)} pages générées.")
-    log.info(f"{len(png_files)} pages PNG générées.")
+        last_pages = packer.finish()
+        laid_out["total"] = laid_out["pages"] + len(last_pages)
 
-    # ---------------------------------------------------------
-    # 3) Upload PNG
-    # ---------------------------------------------------------
-    print("📤 Upload des PNG dans Google Drive…")
-    log.info("Upload des PNG dans Drive.")
+        print(f"✔ {laid_out['total']} pages mises en page ({date_str}).")
+        log.info(f"{laid_out['total']} pages PNG mises en page ({date_str}).")
 
-    for i, png_bytes in enumerate(png_files, start=1):
-        filename = f"resultats_{date_str}_batch{batch_number}_page{i}-{len(png_files)}.png"
-        upload_png_bytes(png_bytes, filename, PNG_FOLDER_ID)
+        for page in last_pages:
+            laid_out["pages"] += 1
+            yield laid_out["pages"], page
 
-        print(f"  → Page {i} uploadée.")
-        log.info(f"PNG page {i} uploadé.")
+    stages.append(Stage("layout", layout, fanout=True, flush=finish_layout))
 
     # ---------------------------------------------------------
-    # 4) Upload du log horodaté
+    # 3) Rendu (pages modifiées uniquement) puis upload PNG
     # ---------------------------------------------------------
+    print(f"🖼 Génération + upload des images PNG ({date_str})…")
+    log.info(f"Rendu et upload des PNG dans Drive (pipeline, {date_str}).")
+
+    extension = page_extension()
+    mimetype = page_mimetype()
+
+    def png_filename(i):
+        return (
+            f"resultats_{date_str}_batch{batch_number}"
+            f"_page{i}-{laid_out['total']}.{extension}"
+        )
+
+    # Nom provisoire (total encore inconnu), renommé pageX-Y en fin de run
+    def provisional_filename(i):
+        return f"resultats_{date_str}_batch{batch_number}_page{i}.{extension}"
+
+    hashes = {}
+    unchanged = []
+    renderer = PageRenderer(workers=render_workers)
+
+    def render(entry):
+        i, page = entry
+        h = hashes[i] = page_hash(page, mode=LAYOUT_MODE)
+
+        # Contenu déjà publié : ni rendu ni upload, au plus un renommage
+        png_bytes = None if manifest.published_id(h) else renderer.render(page)
+        return i, page, h, png_bytes
+
+    def upload(entry):
+        i, page, h, png_bytes = entry
+
+        png_id = manifest.published_id(h)
+        if png_id:
+            unchanged.append(i)
+            return png_id
+
+        if png_bytes is None:
+            png_bytes = renderer.render(page)
+
+        # Upload immédiat, sans attendre la fin de l'extraction
+        filename = provisional_filename(i)
+
+        # Upsert : pages identiques ignorées, pages modifiées mises à jour
+        png_id = upload_png_bytes(
+            png_bytes, filename, PNG_FOLDER_ID, upsert=True, mimetype=mimetype
+        )
+        manifest.record(h, filename, png_id)
+        manifest.checkpoint()
+
+        print(f"  → Page {i} ({date_str}) uploadée.")
+        log.info(f"PNG {date_str} page {i} uploadé (ID={png_id}).")
+        return png_id
+
+    stages.append(Stage("render", render, workers=render_workers))
+    stages.append(Stage("upload", upload, workers=DRIVE_UPLOAD_WORKERS))
+
+    pipeline = Pipeline(stages, queue_size=PIPELINE_QUEUE_SIZE)
+
+    try:
+        with renderer:
+            png_ids = pipeline.run(items)
+
+        # Total connu : noms définitifs pageX-Y (renommage groupé)
+        renamed = manifest.finalize({hashes[i]: png_filename(i) for i in hashes})
+        if renamed:
+            log.info(f"{renamed} PNG renommé(s) vers leur nom définitif ({date_str}).")
+    except Exception:
+        log.info(pipeline.report())
+
+        # Run interrompu : ce qui est fait est conservé pour le prochain run
+        try:
+            manifest.save()
+            log.info(f"Point de reprise {date_str} sauvegardé ({len(manifest.pages)} page(s)).")
+        except Exception as e:
+            log.error(f"Point de reprise {date_str} non sauvegardé : {e}")
+        raise
+
+    log.info(pipeline.report())
+
+    # Pages d'une mise en page précédente (autre total, autre contenu) → corbeille
+    stale_ids = manifest.prune(hashes.values())
+    if stale_ids:
+        log.info(f"{len(stale_ids)} PNG périmé(s) mis à la corbeille ({date_str}).")
+
+    manifest.clear_leagues()
+    manifest.save()
+
+    uploaded = len(png_ids) - len(unchanged)
+    print(f"✔ {date_str} : {uploaded} pages générées et uploadées, {len(unchanged)} inchangées.")
+    log.info(f"{date_str} : {uploaded} pages PNG générées et uploadées, {len(unchanged)} inchangées.")
+
+    return png_ids
+
+# ---------------------------------------------------------
+# BACKFILL : plusieurs journées, une extraction pour toute la plage
+# ---------------------------------------------------------
+def run_backfill(date_from, date_to, batch_number, max_workers=BACKFILL_WORKERS):
+    """
+    Traite toutes les journées de date_from à date_to (inclus).
+    - journées dont le JSON existe déjà : rien à extraire
+    - autres journées : une seule extraction sur la plage, découpée par jour
+    - journées traitées en parallèle (max_workers à la fois)
+    """
+
+    days = [
+        (date_from + timedelta(days=i)).isoformat()
+        for i in range((date_to - date_from).days + 1)
+    ]
+
+    json_index = get_folder_index(JSON_FOLDER_ID)
+    missing = [day for day in days if not json_index.exists(f"results_{day}.json")]
+
+    print(f"📆 Backfill {days[0]} → {days[-1]} : {len(days)} journée(s), {len(missing)} à extraire.")
+    log.info(f"Backfill {days[0]} → {days[-1]}, JSON manquants : {missing}")
+
+    fetched = {}
+
+    if missing:
+        leagues_to_process = get_leagues_for_active_batches()
+        log.info(f"Ligues à traiter : {[l['code'] for l in leagues_to_process]}")
+
+        fetched = fetch_range(leagues_to_process, missing)
+
+        cache_stats = get_cache_stats()
+        if cache_stats:
+            print(f"🗄 Cache API : {cache_stats}")
+            log.info(f"Cache API : {cache_stats}")
+
+    max_workers = max(1, min(max_workers, len(days)))
+    # Les processus de rendu sont partagés entre les journées en cours
+    render_workers = max(1, RENDER_WORKERS // max_workers)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            day: executor.submit(run_day, day, batch_number, fetched.get(day), render_workers)
+            for day in days
+        }
+
+        failed = []
+        for day, future in futures.items():
+            try:
+                future.result()
+            except Exception as e:
+                print(f"[ERREUR] Journée {day} : {e}")
+                log.error(f"Journée {day} en échec : {e}")
+                failed.append(day)
+
+    if failed:
+        raise RuntimeError(f"Backfill incomplet, journées en échec : {failed}")
+
+# ---------------------------------------------------------
+# Upload du log horodaté
+# ---------------------------------------------------------
+def upload_log(timestamp):
     print("📝 Upload du log dans Google Drive…")
     log.info("Upload du log dans Drive.")
 
@@ -186,6 +548,66 @@ if __name__ == "__main__":
     print(f"✔ Log uploadé : {log_filename}")
     log.info(f"Log uploadé dans Drive : {log_filename}")
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Pipeline résultats football → Google Drive")
+    parser.add_argument(
+        "--from", dest="date_from", type=date.fromisoformat,
+        help="Backfill : première journée (YYYY-MM-DD, heure de Paris)"
+    )
+    parser.add_argument(
+        "--to", dest="date_to", type=date.fromisoformat,
+        help="Backfill : dernière journée incluse (défaut : --from)"
+    )
+    args = parser.parse_args()
+
+    if args.date_to and not args.date_from:
+        parser.error("--to nécessite --from")
+    if args.date_from and args.date_to and args.date_to < args.date_from:
+        parser.error("--to doit être postérieur ou égal à --from")
+
+    return args
+
+# ---------------------------------------------------------
+# MAIN PIPELINE
+# ---------------------------------------------------------
+if __name__ == "__main__":
+
+    args = parse_args()
+
+    print("=== 🚀 DÉMARRAGE DU PIPELINE FOOTBALL ===")
+    log.info("Pipeline démarré.")
+
+    # ---------------------------------------------------------
+    # Gestion du fuseau horaire France (Europe/Paris)
+    # ---------------------------------------------------------
+    now_paris = datetime.now(PARIS)
+    timestamp = now_paris.strftime("%Y-%m-%d_%H-%M-%S")
+
+    # Récupération du batch utilisé (si plusieurs, on prend le premier)
+    batch_number = ACTIVE_BATCHES[0] if ACTIVE_BATCHES else "X"
+
+    print(f"Heure locale France : {now_paris.strftime('%Y-%m-%d %H:%M:%S')}")
+    log.info(f"Heure locale France : {now_paris.strftime('%Y-%m-%d %H:%M:%S')}")
+
+    if args.date_from:
+        run_backfill(args.date_from, args.date_to or args.date_from, batch_number)
+
+    else:
+        target_date = now_paris - timedelta(days=1)
+        date_str = target_date.strftime("%Y-%m-%d")
+
+        print(f"Date ciblée : {date_str}")
+        log.info(f"Date ciblée : {date_str}")
+
+        run_day(date_str, batch_number)
+
+    log.info(f"Cache texte : {text_cache_stats()}")
+
+    # ---------------------------------------------------------
+    # 4) Upload du log horodaté
+    # ---------------------------------------------------------
+    upload_log(timestamp)
+
     # ---------------------------------------------------------
     # FIN
     # ---------------------------------------------------------
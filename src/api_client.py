@@ -1,38 +1,183 @@
 import os
 import time
-import requests
+import threading
+from datetime import date as date_cls, datetime, timezone
 from requests.exceptions import RequestException, Timeout
 
-from src.config import API_KEY, BASE_URL
+from src.config import (
+    API_KEY,
+    BASE_URL,
+    API_REQUESTS_PER_MINUTE,
+    API_MAX_COMPETITIONS_PER_REQUEST,
+    CACHE_DIR,
+    API_CACHE_ENABLED,
+    API_CACHE_TTL_LIVE
+)
+from src.http_session import get_session
+from src.response_cache import ResponseCache
 
 
-def get_matches(league_code, date, retries=3, timeout=10):
+# ---------------------------------------------------------
+# Limiteur de débit (token bucket partagé entre threads)
+# ---------------------------------------------------------
+class RateLimiter:
     """
-    Récupère les matchs d'une ligue pour une date donnée.
-    Gère :
-    - soft-ban (403 / 429)
-    - backoff exponentiel
-    - JSON vide
-    - erreurs API
+    Token bucket calé sur le quota du plan (requêtes / minute).
+    - acquire() bloque jusqu'à ce qu'un jeton soit disponible
+    - update_from_headers() recale le bucket sur les en-têtes
+      X-Requests-Available-Minute / X-RequestCounter-Reset de l'API
+    """
+
+    def __init__(self, requests_per_minute):
+        self.capacity = max(1, requests_per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = now - self.updated
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+
+                if now >= self.blocked_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                wait = max(self.blocked_until - now, (1 - self.tokens) / self.rate)
+
+            time.sleep(wait)
+
+    def update_from_headers(self, headers):
+        available = _header_int(headers, "X-Requests-Available-Minute")
+        reset = _header_int(headers, "X-RequestCounter-Reset")
+
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+
+            # Le serveur fait foi s'il est plus strict que notre estimation
+            if available is not None:
+                self.tokens = min(self.tokens, float(available))
+
+            # Quota épuisé → plus aucune requête avant le reset du compteur
+            if available == 0 and reset is not None:
+                self.blocked_until = max(self.blocked_until, now + reset)
+
+    def block_for(self, seconds):
+        with self._lock:
+            self.tokens = 0.0
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+def _header_int(headers, name):
+    try:
+        return int(headers.get(name))
+    except (TypeError, ValueError):
+        return None
+
+
+_rate_limiter = RateLimiter(API_REQUESTS_PER_MINUTE)
+
+
+# ---------------------------------------------------------
+# Cache disque des réponses
+# ---------------------------------------------------------
+_response_cache = ResponseCache(os.path.join(CACHE_DIR, "api")) if API_CACHE_ENABLED else None
+
+# Statuts définitifs : la réponse ne bougera plus
+FINAL_STATUSES = {"FINISHED", "AWARDED", "CANCELLED", "POSTPONED"}
+
+
+def _cache_ttl(data, date_to):
+    """
+    - journée passée + tous les matchs terminés → None (indéfini)
+    - sinon (journée en cours / à venir) → API_CACHE_TTL_LIVE secondes
+    """
+    today_utc = datetime.now(timezone.utc).date()
+
+    try:
+        day_over = date_cls.fromisoformat(date_to) < today_utc
+    except (TypeError, ValueError):
+        day_over = False
+
+    matches = data.get("matches", []) if isinstance(data, dict) else []
+    all_final = all(m.get("status") in FINAL_STATUSES for m in matches)
+
+    return None if day_over and all_final else API_CACHE_TTL_LIVE
+
+
+def get_cache_stats():
+    """Statistiques hits / misses / revalidations du cache API."""
+    return _response_cache.stats() if _response_cache else {}
+
+
+
+def _fetch_json(url, label, retries=3, timeout=10, date_to=None):
+    """
+    GET authentifié sur l'API avec cache disque, limiteur, soft-ban et retries.
+    - entrée de cache fraîche → aucune requête
+    - entrée expirée → requête conditionnelle (ETag / Last-Modified)
+    Retourne le JSON décodé, ou None si toutes les tentatives échouent.
     """
 
     if not API_KEY:
         raise RuntimeError("[ERREUR] API_KEY introuvable dans .env")
 
-    url = f"{BASE_URL}/competitions/{league_code}/matches?dateFrom={date}&dateTo={date}"
+    entry = None
+
+    if _response_cache:
+        entry, fresh = _response_cache.lookup(url)
+        if fresh:
+            print(f"[CACHE] {label} → réponse locale")
+            return entry["data"]
+
     headers = {"X-Auth-Token": API_KEY}
 
+    if entry:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
     for attempt in range(1, retries + 1):
         try:
-            response = requests.get(url, headers=headers, timeout=timeout)
+            _rate_limiter.acquire()
+            response = get_session().get(url, headers=headers, timeout=timeout)
+            _rate_limiter.update_from_headers(response.headers)
+
+            # -------------------------------
+            # 🔸 Non modifié depuis la dernière fois
+            # -------------------------------
+            if response.status_code == 304 and entry:
+                print(f"[CACHE] {label} → inchangé (304)")
+                _response_cache.revalidated(entry, _cache_ttl(entry["data"], date_to))
+                return entry["data"]
 
             # -------------------------------
             # 🔥 Détection SOFT-BAN
             # -------------------------------
+            # 403 sans quota épuisé : compétition hors abonnement, définitif
+            # → échec immédiat pour cette requête, sans pause des autres threads
+            quota_exhausted = _header_int(response.headers, "X-Requests-Available-Minute") == 0
+
+            if response.status_code == 403 and not quota_exhausted:
+                print(f"[ACCÈS REFUSÉ] {label} → 403, compétition hors abonnement ?")
+                return None
+
             if response.status_code in (403, 429):
-                wait = attempt * 5
-                print(f"[SOFT-BAN] {league_code} → pause {wait}s…")
-                time.sleep(wait)
+                reset = _header_int(response.headers, "X-RequestCounter-Reset")
+                wait = reset if reset is not None else attempt * 5
+                print(f"[SOFT-BAN] {label} → pause {wait}s…")
+                # La pause est portée par le limiteur : tous les threads attendent
+                _rate_limiter.block_for(wait)
                 continue
 
             # -------------------------------
@@ -42,30 +187,110 @@ def get_matches(league_code, date, retries=3, timeout=10):
 
             data = response.json()
 
-            # -------------------------------
-            # 🔸 JSON vide
-            # -------------------------------
-            if not data or "matches" not in data:
-                print(f"[INFO] Aucun match trouvé pour {league_code} le {date}")
-                return {}
-
-            # -------------------------------
-            # 🔸 Message d’erreur dans la réponse
-            # -------------------------------
-            if isinstance(data, dict) and "error" in data:
-                print(f"[ERREUR API] {league_code} : {data['error']}")
-                return {}
+            if _response_cache and isinstance(data, dict) and "error" not in data:
+                _response_cache.store(
+                    url,
+                    data,
+                    _cache_ttl(data, date_to),
+                    etag=response.headers.get("ETag"),
+                    last_modified=response.headers.get("Last-Modified"),
+                )
 
             return data
 
         except Timeout:
-            print(f"[TIMEOUT] Tentative {attempt}/{retries} pour {league_code}")
+            print(f"[TIMEOUT] Tentative {attempt}/{retries} pour {label}")
 
         except RequestException as e:
-            print(f"[ERREUR API] {league_code} (tentative {attempt}/{retries}) : {e}")
+            print(f"[ERREUR API] {label} (tentative {attempt}/{retries}) : {e}")
 
     # -------------------------------
     # ❌ Échec après retries
     # -------------------------------
-    print(f"[ECHEC] Impossible de récupérer les données pour {league_code} après {retries} tentatives.")
-    return {}
+    print(f"[ECHEC] Impossible de récupérer les données pour {label} après {retries} tentatives.")
+    return None
+
+
+def get_matches(league_code, date, retries=3, timeout=10, date_to=None):
+    """
+    Récupère les matchs d'une ligue pour une date donnée
+    (ou de `date` à `date_to` inclus).
+    Gère :
+    - quota (token bucket partagé, recalé sur les en-têtes API)
+    - soft-ban (429, ou 403 quota épuisé) ; autre 403 → échec immédiat
+    - backoff exponentiel
+    - JSON vide
+    - erreurs API
+    """
+
+    date_to = date_to or date
+    url = f"{BASE_URL}/competitions/{league_code}/matches?dateFrom={date}&dateTo={date_to}"
+
+    data = _fetch_json(url, league_code, retries=retries, timeout=timeout, date_to=date_to)
+
+    if data is None:
+        return {}
+
+    # -------------------------------
+    # 🔸 JSON vide
+    # -------------------------------
+    if not data or "matches" not in data:
+        print(f"[INFO] Aucun match trouvé pour {league_code} le {date}")
+        return {}
+
+    # -------------------------------
+    # 🔸 Message d’erreur dans la réponse
+    # -------------------------------
+    if isinstance(data, dict) and "error" in data:
+        print(f"[ERREUR API] {league_code} : {data['error']}")
+        return {}
+
+    return data
+
+
+def get_matches_bulk(league_codes, date_from, date_to=None, retries=3, timeout=10,
+                     chunk_size=API_MAX_COMPETITIONS_PER_REQUEST):
+    """
+    Récupère les matchs de plusieurs ligues via /matches?competitions=…
+    - une requête par groupe de chunk_size compétitions
+    - réponse redécoupée par code : {code: {"competition": {...}, "matches": [...]}}
+    - les codes d'un groupe en échec sont absents du résultat
+      (à l'appelant de les récupérer ligue par ligue)
+    """
+
+    date_to = date_to or date_from
+    codes = list(league_codes)
+    chunk_size = max(1, chunk_size)
+    resultat = {}
+
+    for i in range(0, len(codes), chunk_size):
+        group = codes[i:i + chunk_size]
+        label = ",".join(group)
+
+        url = (
+            f"{BASE_URL}/matches?competitions={label}"
+            f"&dateFrom={date_from}&dateTo={date_to}"
+        )
+
+        data = _fetch_json(url, label, retries=retries, timeout=timeout, date_to=date_to)
+
+        if not isinstance(data, dict) or "matches" not in data or "error" in data:
+            print(f"[ERREUR API] Requête groupée {label} inexploitable.")
+            continue
+
+        # Chaque code demandé a son entrée, même sans match ce jour-là
+        for code in group:
+            resultat[code] = {"competition": {"code": code}, "matches": []}
+
+        for match in data["matches"]:
+            competition = match.get("competition") or {}
+            code = competition.get("code")
+
+            if code not in group:
+                continue
+
+            resultat[code]["competition"] = competition
+            resultat[code]["matches"].append(match)
+
+    # Ordre des clés = ordre des codes demandés
+    return {code: resultat[code] for code in codes if code in resultat}
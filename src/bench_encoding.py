@@ -0,0 +1,95 @@
+"""
+Benchmark des options d'encodage des pages.
+
+    python -m src.bench_encoding                     # journée synthétique
+    python -m src.bench_encoding results_2025-01-12.json
+
+Pour chaque préréglage : octets par page (moyenne) et temps d'encodage.
+"""
+import sys
+import json
+import time
+
+from src.generate_image import draw_page, encode_page, layout_pages, prefetch_logos
+
+# ---------------------------------------------------------
+# Préréglages comparés
+# ---------------------------------------------------------
+PRESETS = {
+    "png (défaut)": {"format": "png", "compress_level": 6, "optimize": False, "quantize": False},
+    "png level 1": {"format": "png", "compress_level": 1, "optimize": False, "quantize": False},
+    "png level 9 + optimize": {"format": "png", "compress_level": 9, "optimize": True, "quantize": False},
+    "png palette 256": {"format": "png", "compress_level": 9, "optimize": False, "quantize": True},
+    "png palette 256 + optimize": {"format": "png", "compress_level": 9, "optimize": True, "quantize": True},
+    "webp lossless": {"format": "webp", "lossless": True, "quantize": False},
+    "webp q90": {"format": "webp", "lossless": False, "quality": 90, "quantize": False},
+}
+
+TEAMS = [
+    "Paris Saint-Germain FC", "Olympique de Marseille", "AS Monaco FC",
+    "Borussia Mönchengladbach", "Wolverhampton Wanderers FC", "Real Madrid CF",
+    "Brighton & Hove Albion FC", "Club Atlético de Madrid", "SSC Napoli", "Lille OSC",
+]
+
+
+def synthetic_resultat(leagues=6, matches_per_league=8):
+    """Journée fictive (sans logos réseau) pour un benchmark reproductible."""
+    resultat = {}
+
+    for l in range(leagues):
+        matches = []
+        for m in range(matches_per_league):
+            matches.append({
+                "homeTeam": {"name": TEAMS[(l + m) % len(TEAMS)], "crest": None},
+                "awayTeam": {"name": TEAMS[(l + 2 * m + 1) % len(TEAMS)], "crest": None},
+                "score": {"fullTime": {"home": (l + m) % 5, "away": m % 3}},
+            })
+        resultat[f"L{l}"] = {"name": f"League {l}", "competition": {}, "matches": matches}
+
+    return resultat
+
+
+def bench(resultat, date_str, presets=PRESETS):
+    prefetch_logos(resultat)
+    images = [draw_page(page) for page in layout_pages(resultat, date_str)]
+
+    if not images:
+        print("Aucune page à encoder.")
+        return {}
+
+    results = {}
+
+    for name, encoding in presets.items():
+        sizes = []
+        start = time.perf_counter()
+
+        for img in images:
+            sizes.append(len(encode_page(img, encoding)))
+
+        elapsed = time.perf_counter() - start
+        results[name] = {
+            "bytes_per_page": sum(sizes) / len(sizes),
+            "ms_per_page": elapsed * 1000 / len(images),
+        }
+
+    baseline = results[next(iter(presets))]["bytes_per_page"]
+
+    print(f"{len(images)} page(s) — {date_str}")
+    print(f"{'préréglage':<28}{'octets/page':>14}{'ratio':>8}{'ms/page':>10}")
+    for name, r in results.items():
+        ratio = r["bytes_per_page"] / baseline
+        print(f"{name:<28}{r['bytes_per_page']:>14,.0f}{ratio:>8.2f}{r['ms_per_page']:>10.1f}")
+
+    return results
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], "r", encoding="utf-8") as f:
+            resultat = json.load(f)
+        date_str = sys.argv[1].rsplit("results_", 1)[-1].removesuffix(".json")
+    else:
+        resultat = synthetic_resultat()
+        date_str = "2025-01-12"
+
+    bench(resultat, date_str)
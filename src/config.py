@@ -30,3 +30,107 @@ if not API_KEY:
 # Batchs actifs (modifiable manuellement)
 # ---------------------------------------------------------
 ACTIVE_BATCHES = [1, 2, 3, 7, 9, 13]
+
+# ---------------------------------------------------------
+# Extraction API : nombre de requêtes simultanées
+# ---------------------------------------------------------
+FETCH_MAX_WORKERS = int(os.getenv("FETCH_MAX_WORKERS", "4"))
+
+# ---------------------------------------------------------
+# Limite de requêtes du plan football-data.org (free = 10/min)
+# ---------------------------------------------------------
+API_REQUESTS_PER_MINUTE = int(os.getenv("API_REQUESTS_PER_MINUTE", "10"))
+
+# ---------------------------------------------------------
+# Session HTTP partagée (keep-alive + pool de connexions)
+# ---------------------------------------------------------
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "16"))
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "3"))
+
+# ---------------------------------------------------------
+# Extraction groupée : /matches?competitions=PL,BL1,…
+# ---------------------------------------------------------
+API_BULK_FETCH = os.getenv("API_BULK_FETCH", "1") == "1"
+API_MAX_COMPETITIONS_PER_REQUEST = int(os.getenv("API_MAX_COMPETITIONS_PER_REQUEST", "20"))
+# Amplitude max dateFrom → dateTo acceptée par l'API (jours)
+API_MAX_DAYS_PER_REQUEST = int(os.getenv("API_MAX_DAYS_PER_REQUEST", "10"))
+
+# ---------------------------------------------------------
+# Pipeline fetch → layout → render → upload : éléments en attente
+# max entre deux étages
+# ---------------------------------------------------------
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "8"))
+
+# ---------------------------------------------------------
+# Backfill (--from / --to) : journées traitées en parallèle
+# ---------------------------------------------------------
+BACKFILL_WORKERS = int(os.getenv("BACKFILL_WORKERS", "2"))
+
+# ---------------------------------------------------------
+# Cache disque (réponses API, etc.) — restaurable entre runs CI
+# ---------------------------------------------------------
+CACHE_DIR = os.getenv("CACHE_DIR", os.path.join(ROOT_DIR, ".cache"))
+API_CACHE_ENABLED = os.getenv("API_CACHE_ENABLED", "1") == "1"
+API_CACHE_TTL_LIVE = int(os.getenv("API_CACHE_TTL_LIVE", "300"))
+
+# ---------------------------------------------------------
+# Point de reprise par journée (Drive + copie locale) :
+# sauvegarde Drive au plus toutes les CHECKPOINT_INTERVAL secondes
+# ---------------------------------------------------------
+CHECKPOINT_DIR = os.getenv("CHECKPOINT_DIR", os.path.join(CACHE_DIR, "checkpoints"))
+CHECKPOINT_INTERVAL = int(os.getenv("CHECKPOINT_INTERVAL", "30"))
+
+# ---------------------------------------------------------
+# Upload Drive : concurrence + retries par fichier
+# ---------------------------------------------------------
+DRIVE_UPLOAD_WORKERS = int(os.getenv("DRIVE_UPLOAD_WORKERS", "4"))
+DRIVE_UPLOAD_RETRIES = int(os.getenv("DRIVE_UPLOAD_RETRIES", "5"))
+
+# ---------------------------------------------------------
+# Index des dossiers Drive (persistance locale, 0 = désactivée)
+# ---------------------------------------------------------
+DRIVE_INDEX_TTL = int(os.getenv("DRIVE_INDEX_TTL", "0"))
+
+# ---------------------------------------------------------
+# Upload Drive résumable (gros JSON de backfill, logs longs)
+# ---------------------------------------------------------
+DRIVE_RESUMABLE_THRESHOLD = int(os.getenv("DRIVE_RESUMABLE_THRESHOLD", str(5 * 1024 * 1024)))
+# Multiple de 256 Ko imposé par l'API
+DRIVE_CHUNK_SIZE = int(os.getenv("DRIVE_CHUNK_SIZE", str(1024 * 1024)))
+
+# ---------------------------------------------------------
+# Préchargement des logos (téléchargements simultanés)
+# ---------------------------------------------------------
+LOGO_PREFETCH_WORKERS = int(os.getenv("LOGO_PREFETCH_WORKERS", "16"))
+
+# ---------------------------------------------------------
+# Stock disque des logos redimensionnés (LRU borné en taille)
+# ---------------------------------------------------------
+LOGO_STORE_ENABLED = os.getenv("LOGO_STORE_ENABLED", "1") == "1"
+LOGO_STORE_MAX_BYTES = int(os.getenv("LOGO_STORE_MAX_BYTES", str(50 * 1024 * 1024)))
+# Un logo en échec n'est pas retenté avant ce délai (secondes)
+LOGO_FAILURE_TTL = int(os.getenv("LOGO_FAILURE_TTL", str(7 * 24 * 3600)))
+
+# ---------------------------------------------------------
+# Rendu des pages : nombre de processus (1 = rendu séquentiel)
+# ---------------------------------------------------------
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", str(os.cpu_count() or 1)))
+
+# ---------------------------------------------------------
+# Mise en page : "packed" (plusieurs ligues par page),
+# "league" (une ligue par page) ou "block" (un bloc par page)
+# ---------------------------------------------------------
+LAYOUT_MODE = os.getenv("LAYOUT_MODE", "packed")
+
+# ---------------------------------------------------------
+# Encodage des pages (voir python -m src.bench_encoding)
+# - PAGE_FORMAT : "png" ou "webp"
+# - PNG_QUANTIZE : palette adaptative de PNG_COLORS couleurs
+# ---------------------------------------------------------
+PAGE_FORMAT = os.getenv("PAGE_FORMAT", "png").lower()
+PNG_COMPRESS_LEVEL = int(os.getenv("PNG_COMPRESS_LEVEL", "6"))
+PNG_OPTIMIZE = os.getenv("PNG_OPTIMIZE", "0") == "1"
+PNG_QUANTIZE = os.getenv("PNG_QUANTIZE", "0") == "1"
+PNG_COLORS = int(os.getenv("PNG_COLORS", "256"))
+WEBP_LOSSLESS = os.getenv("WEBP_LOSSLESS", "1") == "1"
+WEBP_QUALITY = int(os.getenv("WEBP_QUALITY", "90"))
@@ -1,18 +1,34 @@
 import os
 import io
 import json
+import time
+import hashlib
+import random
+import threading
+
+import httplib2
 
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
+from google_auth_httplib2 import AuthorizedHttp
 
 from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
 from googleapiclient.http import (
     MediaFileUpload,
     MediaIoBaseUpload,
     MediaIoBaseDownload
 )
 
+from src.config import (
+    CACHE_DIR,
+    DRIVE_INDEX_TTL,
+    DRIVE_UPLOAD_RETRIES,
+    DRIVE_RESUMABLE_THRESHOLD,
+    DRIVE_CHUNK_SIZE
+)
+
 # ---------------------------------------------------------
 # Scopes : accès en lecture/écriture aux fichiers Drive
 # ---------------------------------------------------------
@@ -23,9 +39,16 @@ OAUTH_CREDENTIALS_PATH = "credentials_oauth.json"
 
 
 # ---------------------------------------------------------
-# Service Drive (local + GitHub Actions)
+# Credentials Drive (local + GitHub Actions)
 # ---------------------------------------------------------
-def _get_service():
+_creds = None
+_creds_lock = threading.Lock()
+
+# Un service (et donc un objet http) par thread : httplib2 n'est pas thread-safe
+_thread_local = threading.local()
+
+
+def _load_credentials():
     """
     Fonction hybride :
     - En local : utilise credentials_oauth.json + token.json
@@ -59,7 +82,7 @@ def _get_service():
             with open(TOKEN_PATH, "w", encoding="utf-8") as token_file:
                 token_file.write(creds.to_json())
 
-        return build("drive", "v3", credentials=creds)
+        return creds
 
     # -----------------------------------------------------
     # 2) MODE GITHUB ACTIONS : utiliser les secrets
@@ -73,8 +96,262 @@ def _get_service():
         "token_uri": "https://oauth2.googleapis.com/token"
     }
 
-    creds = Credentials.from_authorized_user_info(creds_data)
-    return build("drive", "v3", credentials=creds)
+    return Credentials.from_authorized_user_info(creds_data)
+
+
+def _get_credentials():
+    """
+    Credentials chargés une seule fois par processus.
+    Le token n'est rafraîchi que lorsqu'il est expiré (ou pas encore obtenu).
+    """
+
+    global _creds
+
+    with _creds_lock:
+        if _creds is None:
+            _creds = _load_credentials()
+
+        if not _creds.valid and _creds.refresh_token:
+            _creds.refresh(Request())
+
+        return _creds
+
+
+# ---------------------------------------------------------
+# Service Drive (construit une fois par thread)
+# ---------------------------------------------------------
+def _get_service():
+    creds = _get_credentials()
+
+    service = getattr(_thread_local, "service", None)
+
+    if service is None:
+        # AuthorizedHttp rafraîchit lui-même le token sur un 401
+        http = AuthorizedHttp(creds, http=httplib2.Http())
+        service = build("drive", "v3", http=http, cache_discovery=False)
+        _thread_local.service = service
+
+    return service
+
+
+# ---------------------------------------------------------
+# Index d'un dossier Drive (nom → métadonnées)
+# ---------------------------------------------------------
+FILE_FIELDS = "id, name, md5Checksum, modifiedTime"
+
+
+class DriveFolderIndex:
+    """
+    Liste d'un dossier Drive gardée en mémoire : une requête paginée,
+    puis existence / ID / checksum en O(1).
+    - persist_ttl > 0 : index sauvegardé sur disque et réutilisé tant
+      qu'il a moins de persist_ttl secondes
+    - les uploads du processus mettent l'index à jour (record)
+    """
+
+    def __init__(self, folder_id, persist_ttl=DRIVE_INDEX_TTL,
+                 persist_dir=os.path.join(CACHE_DIR, "drive_index")):
+        self.folder_id = folder_id
+        self.persist_ttl = persist_ttl
+        self.persist_path = os.path.join(persist_dir, f"{folder_id}.json")
+        self.files = {}
+        self._lock = threading.Lock()
+
+    def load(self):
+        if self.persist_ttl > 0 and self._load_persisted():
+            return self
+        return self.refresh()
+
+    def _load_persisted(self):
+        try:
+            if time.time() - os.path.getmtime(self.persist_path) > self.persist_ttl:
+                return False
+            with open(self.persist_path, "r", encoding="utf-8") as f:
+                files = json.load(f)
+        except (OSError, ValueError):
+            return False
+
+        with self._lock:
+            self.files = files
+        return True
+
+    def _persist(self):
+        if self.persist_ttl <= 0:
+            return
+
+        os.makedirs(os.path.dirname(self.persist_path), exist_ok=True)
+        tmp_path = f"{self.persist_path}.{threading.get_ident()}.tmp"
+
+        with self._lock:
+            files = dict(self.files)
+
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(files, f, ensure_ascii=False)
+        os.replace(tmp_path, self.persist_path)
+
+    def refresh(self):
+        service = _get_service()
+        files = {}
+        page_token = None
+
+        while True:
+            request = service.files().list(
+                q=f"'{self.folder_id}' in parents and trashed = false",
+                spaces="drive",
+                fields=f"nextPageToken, files({FILE_FIELDS})",
+                orderBy="modifiedTime",
+                pageSize=1000,
+                pageToken=page_token
+            )
+            results = _execute_with_retry(request, f"Listing dossier {self.folder_id}")
+
+            # Tri par date croissante : en cas de doublon, le plus récent gagne
+            for f in results.get("files", []):
+                files[f["name"]] = f
+
+            page_token = results.get("nextPageToken")
+            if not page_token:
+                break
+
+        with self._lock:
+            self.files = files
+
+        print(f"[INFO] Index Drive {self.folder_id} : {len(files)} fichier(s).")
+        self._persist()
+        return self
+
+    def get(self, filename):
+        with self._lock:
+            return self.files.get(filename)
+
+    def exists(self, filename):
+        return self.get(filename) is not None
+
+    def find_id(self, filename):
+        entry = self.get(filename)
+        return entry["id"] if entry else None
+
+    def md5(self, filename):
+        entry = self.get(filename)
+        return entry.get("md5Checksum") if entry else None
+
+    def record(self, file_meta):
+        with self._lock:
+            self.files[file_meta["name"]] = file_meta
+        self._persist()
+
+    def forget_ids(self, file_ids):
+        file_ids = set(file_ids)
+        with self._lock:
+            removed = [name for name, f in self.files.items() if f["id"] in file_ids]
+            for name in removed:
+                del self.files[name]
+        if removed:
+            self._persist()
+
+
+_folder_indexes = {}
+_folder_indexes_lock = threading.Lock()
+
+
+def get_folder_index(folder_id):
+    """Index du dossier, listé au premier appel puis partagé par le processus."""
+
+    with _folder_indexes_lock:
+        index = _folder_indexes.get(folder_id)
+        if index is None:
+            index = DriveFolderIndex(folder_id).load()
+            _folder_indexes[folder_id] = index
+        return index
+
+
+def _index_record(folder_id, file_meta):
+    """Répercute un upload sur l'index du dossier, s'il est déjà chargé."""
+
+    index = _folder_indexes.get(folder_id)
+    if index is not None and "name" in file_meta:
+        index.record(file_meta)
+
+
+# ---------------------------------------------------------
+# Exécution d'une requête Drive avec retries (5xx / 429)
+# ---------------------------------------------------------
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+def _execute_with_retry(request, label, retries=DRIVE_UPLOAD_RETRIES):
+    """
+    Exécute une requête Drive, avec backoff exponentiel (+ jitter) sur :
+    - HttpError 429 / 5xx
+    - erreurs réseau (socket, SSL…)
+    Les autres erreurs sont remontées immédiatement.
+    """
+
+    for attempt in range(1, retries + 1):
+        try:
+            return request.execute()
+
+        except HttpError as e:
+            if e.resp.status not in RETRYABLE_STATUSES or attempt == retries:
+                raise
+            reason = f"HTTP {e.resp.status}"
+
+        except OSError as e:
+            if attempt == retries:
+                raise
+            reason = str(e)
+
+        wait = 2 ** (attempt - 1) + random.random()
+        print(f"[RETRY] {label} ({reason}) → tentative {attempt + 1}/{retries} dans {wait:.1f}s…")
+        time.sleep(wait)
+
+
+# ---------------------------------------------------------
+# Upload résumable par chunks (au-delà du seuil de taille)
+# ---------------------------------------------------------
+def _make_media(stream, mimetype, size):
+    """Media en un seul envoi, ou résumable par chunks au-delà du seuil."""
+
+    if size > DRIVE_RESUMABLE_THRESHOLD:
+        return MediaIoBaseUpload(stream, mimetype=mimetype, chunksize=DRIVE_CHUNK_SIZE, resumable=True)
+    return MediaIoBaseUpload(stream, mimetype=mimetype)
+
+
+def _execute_upload(request, label, retries=DRIVE_UPLOAD_RETRIES):
+    """
+    Exécute un upload :
+    - simple → _execute_with_retry
+    - résumable → envoi chunk par chunk avec progression ; après une erreur
+      429 / 5xx / réseau, next_chunk() interroge Drive et reprend au dernier
+      octet acquitté (rien n'est renvoyé depuis le début)
+    """
+
+    if not request.resumable:
+        return _execute_with_retry(request, label, retries=retries)
+
+    response = None
+    failures = 0
+
+    while response is None:
+        try:
+            status, response = request.next_chunk()
+            failures = 0
+
+            if status:
+                print(f"  ↳ {label} : {int(status.progress() * 100)}%")
+
+        except (HttpError, OSError) as e:
+            retryable = not isinstance(e, HttpError) or e.resp.status in RETRYABLE_STATUSES
+            failures += 1
+
+            if not retryable or failures >= retries:
+                raise
+
+            wait = 2 ** (failures - 1) + random.random()
+            print(f"[RETRY] {label} ({e}) → reprise de l'upload dans {wait:.1f}s…")
+            time.sleep(wait)
+
+    return response
 
 
 # ---------------------------------------------------------
@@ -90,15 +367,23 @@ def upload_to_drive(local_path, drive_filename=None, folder_id=None):
     if folder_id:
         metadata["parents"] = [folder_id]
 
-    media = MediaFileUpload(local_path, mimetype="application/json")
+    resumable = os.path.getsize(local_path) > DRIVE_RESUMABLE_THRESHOLD
+    media = MediaFileUpload(
+        local_path,
+        mimetype="application/json",
+        chunksize=DRIVE_CHUNK_SIZE,
+        resumable=resumable
+    )
 
-    uploaded = service.files().create(
+    request = service.files().create(
         body=metadata,
         media_body=media,
-        fields="id"
-    ).execute()
+        fields=FILE_FIELDS
+    )
+    uploaded = _execute_upload(request, drive_filename)
 
     print(f"📤 Upload réussi — ID Drive : {uploaded['id']}")
+    _index_record(folder_id, uploaded)
     return uploaded["id"]
 
 
@@ -114,15 +399,23 @@ def upload_png_to_drive(local_path, folder_id=None):
     if folder_id:
         metadata["parents"] = [folder_id]
 
-    media = MediaFileUpload(local_path, mimetype="image/png")
+    resumable = os.path.getsize(local_path) > DRIVE_RESUMABLE_THRESHOLD
+    media = MediaFileUpload(
+        local_path,
+        mimetype="image/png",
+        chunksize=DRIVE_CHUNK_SIZE,
+        resumable=resumable
+    )
 
-    uploaded = service.files().create(
+    request = service.files().create(
         body=metadata,
         media_body=media,
-        fields="id"
-    ).execute()
+        fields=FILE_FIELDS
+    )
+    uploaded = _execute_upload(request, filename)
 
     print(f"📤 PNG uploadé — {filename} — ID : {uploaded['id']}")
+    _index_record(folder_id, uploaded)
     return uploaded["id"]
 
 
@@ -146,46 +439,83 @@ def drive_file_exists(filename, folder_id=None):
 
 
 # ---------------------------------------------------------
-# Upload JSON en mémoire
+# Upload de bytes en mémoire (création ou upsert par MD5)
 # ---------------------------------------------------------
-def upload_json_bytes(json_bytes, filename, folder_id=None):
-    service = _get_service()
+def _upload_bytes(data, filename, folder_id, mimetype, upsert=False,
+                  retries=DRIVE_UPLOAD_RETRIES):
+    """
+    Upload générique (résumable par chunks au-delà de DRIVE_RESUMABLE_THRESHOLD).
+    Retourne (métadonnées Drive, action).
+    upsert=True (dossier requis) : on compare le MD5 local au md5Checksum
+    du fichier de même nom dans le dossier :
+    - identique → aucun envoi ("skipped")
+    - différent → files().update sur le fichier existant ("updated")
+    - absent → files().create ("created")
+    """
 
-    metadata = {"name": filename}
-    if folder_id:
-        metadata["parents"] = [folder_id]
+    existing = None
 
-    media = MediaIoBaseUpload(io.BytesIO(json_bytes), mimetype="application/json")
+    if upsert and folder_id:
+        existing = get_folder_index(folder_id).get(filename)
 
-    uploaded = service.files().create(
-        body=metadata,
-        media_body=media,
-        fields="id"
-    ).execute()
+        if existing and existing.get("md5Checksum") == hashlib.md5(data).hexdigest():
+            return existing, "skipped"
 
-    print(f"📤 JSON uploadé — ID : {uploaded['id']}")
-    return uploaded["id"]
+    service = _get_service()
+    media = _make_media(io.BytesIO(data), mimetype, len(data))
+
+    if existing:
+        request = service.files().update(
+            fileId=existing["id"],
+            media_body=media,
+            fields=FILE_FIELDS
+        )
+        action = "updated"
+    else:
+        metadata = {"name": filename}
+        if folder_id:
+            metadata["parents"] = [folder_id]
+
+        request = service.files().create(
+            body=metadata,
+            media_body=media,
+            fields=FILE_FIELDS
+        )
+        action = "created"
+
+    uploaded = _execute_upload(request, filename, retries=retries)
+    _index_record(folder_id, uploaded)
+    return uploaded, action
 
 
 # ---------------------------------------------------------
-# Upload PNG en mémoire
+# Upload JSON en mémoire
 # ---------------------------------------------------------
-def upload_png_bytes(png_bytes, filename, folder_id=None):
-    service = _get_service()
+def upload_json_bytes(json_bytes, filename, folder_id=None, upsert=False):
+    uploaded, action = _upload_bytes(
+        json_bytes, filename, folder_id, "application/json", upsert=upsert
+    )
 
-    metadata = {"name": filename}
-    if folder_id:
-        metadata["parents"] = [folder_id]
+    if action == "skipped":
+        print(f"⏭ JSON inchangé — {filename} — ID : {uploaded['id']}")
+    else:
+        print(f"📤 JSON uploadé — ID : {uploaded['id']}")
+    return uploaded["id"]
 
-    media = MediaIoBaseUpload(io.BytesIO(png_bytes), mimetype="image/png")
 
-    uploaded = service.files().create(
-        body=metadata,
-        media_body=media,
-        fields="id"
-    ).execute()
+# ---------------------------------------------------------
+# Upload PNG en mémoire
+# ---------------------------------------------------------
+def upload_png_bytes(png_bytes, filename, folder_id=None, retries=DRIVE_UPLOAD_RETRIES,
+                     upsert=False, mimetype="image/png"):
+    uploaded, action = _upload_bytes(
+        png_bytes, filename, folder_id, mimetype, upsert=upsert, retries=retries
+    )
 
-    print(f"📤 PNG uploadé — {filename} — ID : {uploaded['id']}")
+    if action == "skipped":
+        print(f"⏭ PNG inchangé — {filename} — ID : {uploaded['id']}")
+    else:
+        print(f"📤 PNG uploadé — {filename} — ID : {uploaded['id']}")
     return uploaded["id"]
 
 
@@ -258,3 +588,144 @@ def download_json_bytes_by_id(file_id):
 
     buffer.seek(0)
     return buffer.getvalue()
+
+
+# ---------------------------------------------------------
+# Requêtes Drive groupées (endpoint batch, 100 appels max)
+# ---------------------------------------------------------
+DRIVE_BATCH_MAX = 100
+
+
+def _execute_batch(build_requests, label, retries=DRIVE_UPLOAD_RETRIES):
+    """
+    Exécute des appels Drive par paquets de DRIVE_BATCH_MAX dans
+    un seul aller-retour HTTP chacun.
+    - build_requests(service) → {request_id: HttpRequest}
+    - les appels en 429 / 5xx sont rejoués (backoff) dans un nouveau batch
+    Retourne (responses, errors) : {request_id: réponse} / {request_id: exception}
+    """
+
+    service = _get_service()
+    pending = build_requests(service)
+    responses = {}
+    errors = {}
+
+    for attempt in range(1, retries + 1):
+        retry_ids = []
+        ids = list(pending)
+
+        for i in range(0, len(ids), DRIVE_BATCH_MAX):
+            batch = service.new_batch_http_request()
+
+            def callback(request_id, response, exception):
+                if exception is None:
+                    responses[request_id] = response
+                    errors.pop(request_id, None)
+                    return
+
+                errors[request_id] = exception
+                if isinstance(exception, HttpError) and exception.resp.status in RETRYABLE_STATUSES:
+                    retry_ids.append(request_id)
+
+            for request_id in ids[i:i + DRIVE_BATCH_MAX]:
+                batch.add(pending[request_id], callback=callback, request_id=request_id)
+
+            _execute_with_retry(batch, label, retries=retries)
+
+        if not retry_ids or attempt == retries:
+            break
+
+        # Une HttpRequest déjà exécutée ne se rejoue pas dans un batch : on la reconstruit
+        rebuilt = build_requests(service)
+        pending = {request_id: rebuilt[request_id] for request_id in retry_ids}
+
+        wait = 2 ** (attempt - 1) + random.random()
+        print(f"[RETRY] {label} : {len(retry_ids)} appel(s) rejoué(s) dans {wait:.1f}s…")
+        time.sleep(wait)
+
+    return responses, errors
+
+
+# ---------------------------------------------------------
+# Renommage groupé
+# ---------------------------------------------------------
+def drive_rename_files(renames):
+    """
+    Renomme plusieurs fichiers en un appel groupé.
+    - renames : {file_id: nouveau nom}
+    Les index de dossiers chargés sont mis à jour.
+    Retourne {file_id: True si OK, False sinon}.
+    """
+
+    items = list(renames.items())
+
+    def build_requests(service):
+        return {
+            str(i): service.files().update(
+                fileId=file_id,
+                body={"name": name},
+                fields=f"{FILE_FIELDS}, parents"
+            )
+            for i, (file_id, name) in enumerate(items)
+        }
+
+    responses, errors = _execute_batch(build_requests, "Renommage groupé Drive")
+
+    # Anciens noms oubliés d'abord : un fichier peut reprendre le nom d'un autre
+    renamed = [items[int(request_id)][0] for request_id in responses]
+    for index in list(_folder_indexes.values()):
+        index.forget_ids(renamed)
+
+    for meta in responses.values():
+        for parent in meta.pop("parents", []):
+            _index_record(parent, meta)
+
+    for request_id, error in errors.items():
+        print(f"[ERREUR DRIVE] Renommage {items[int(request_id)][0]} : {error}")
+
+    print(f"✏ {len(responses)}/{len(items)} fichier(s) renommé(s).")
+
+    return {file_id: str(i) in responses for i, (file_id, _) in enumerate(items)}
+
+
+# ---------------------------------------------------------
+# Suppression / mise à la corbeille groupée
+# ---------------------------------------------------------
+def drive_delete_files(file_ids, trash=True):
+    """
+    Supprime plusieurs fichiers en un appel groupé.
+    - trash=True : mise à la corbeille (récupérable)
+    - trash=False : suppression définitive
+    Retourne {file_id: True si OK, False sinon}.
+    """
+
+    file_ids = list(dict.fromkeys(file_ids))
+
+    def build_requests(service):
+        requests = {}
+
+        for i, file_id in enumerate(file_ids):
+            if trash:
+                requests[str(i)] = service.files().update(
+                    fileId=file_id,
+                    body={"trashed": True},
+                    fields="id"
+                )
+            else:
+                requests[str(i)] = service.files().delete(fileId=file_id)
+
+        return requests
+
+    responses, errors = _execute_batch(build_requests, "Suppression groupée Drive")
+
+    deleted = [file_ids[int(request_id)] for request_id in responses]
+    for index in list(_folder_indexes.values()):
+        index.forget_ids(deleted)
+
+    for request_id, error in errors.items():
+        print(f"[ERREUR DRIVE] Suppression {file_ids[int(request_id)]} : {error}")
+
+    action = "mis à la corbeille" if trash else "supprimé(s)"
+    print(f"🗑 {len(responses)}/{len(file_ids)} fichier(s) {action}.")
+
+    return {file_id: str(i) in responses for i, file_id in enumerate(file_ids)}
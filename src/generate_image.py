@@ -1,9 +1,34 @@
 import io
 import os
 import sys
-import requests
-from datetime import datetime
+import json
+import hashlib
+import threading
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from PIL import Image, ImageDraw, ImageFont
+from requests.exceptions import HTTPError, RequestException
+
+from src.config import (
+    CACHE_DIR,
+    LOGO_PREFETCH_WORKERS,
+    LOGO_STORE_ENABLED,
+    LOGO_STORE_MAX_BYTES,
+    LOGO_FAILURE_TTL,
+    RENDER_WORKERS,
+    LAYOUT_MODE,
+    PAGE_FORMAT,
+    PNG_COMPRESS_LEVEL,
+    PNG_OPTIMIZE,
+    PNG_QUANTIZE,
+    PNG_COLORS,
+    WEBP_LOSSLESS,
+    WEBP_QUALITY
+)
+from src.http_session import get_session
+from src.logo_store import LogoStore
+from src.svg_raster import is_svg, rasterize_svg
 
 # Dimensions principales
 WIDTH, HEIGHT = 1080, 1920
@@ -12,6 +37,9 @@ SAFE_TOP = 250
 SAFE_BOTTOM = 350
 SAFE_RIGHT = 200
 
+# Taille des caches de mesure / découpage de texte
+TEXT_CACHE_SIZE = 4096
+
 # Gestion des chemins (PyInstaller + exécution normale)
 if getattr(sys, "frozen", False):
     BASE_DIR = sys._MEIPASS
@@ -26,17 +54,88 @@ FONT_REGULAR_PATH = os.path.join(FONTS_DIR, "Roboto-Regular.ttf")
 # -------------------------------------------------------------------
 # Helpers typographiques
 # -------------------------------------------------------------------
+_font_cache = {}
+
 def load_font(path, size, fallback=None):
-    try:
-        return ImageFont.truetype(path, size)
-    except Exception:
-        return fallback or ImageFont.load_default()
+    """Police chargée une seule fois par processus pour un couple (path, size)."""
+    key = (path, size)
+
+    if key not in _font_cache:
+        try:
+            _font_cache[key] = ImageFont.truetype(path, size)
+        except Exception:
+            # Échec mémorisé aussi : on ne retente pas le disque à chaque page
+            _font_cache[key] = None
+
+    return _font_cache[key] or fallback or ImageFont.load_default()
+
+class LRUCache:
+    """Petit cache LRU thread-safe avec statistiques hits / misses."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+# Clés : (police, texte, …, mode du canvas) — les polices sont elles-mêmes
+# en cache, donc un même objet police = une même taille de texte
+_measure_cache = LRUCache(TEXT_CACHE_SIZE)
+_wrap_cache = LRUCache(TEXT_CACHE_SIZE)
+
+def text_cache_stats():
+    return {"measure": _measure_cache.stats(), "wrap": _wrap_cache.stats()}
 
 def measure(draw, text, font):
-    bbox = draw.textbbox((0, 0), text, font=font)
-    return bbox[2] - bbox[0], bbox[3] - bbox[1]
+    key = (font, text, draw.mode)
+    size = _measure_cache.get(key)
+
+    if size is None:
+        bbox = draw.textbbox((0, 0), text, font=font)
+        size = (bbox[2] - bbox[0], bbox[3] - bbox[1])
+        _measure_cache.put(key, size)
+
+    return size
 
 def wrap_lines(draw, text, font, max_width, max_lines=3):
+    key = (font, text, max_width, max_lines, draw.mode)
+    lines = _wrap_cache.get(key)
+
+    if lines is None:
+        lines = tuple(_wrap_lines(draw, text, font, max_width, max_lines))
+        _wrap_cache.put(key, lines)
+
+    return list(lines)
+
+def _wrap_lines(draw, text, font, max_width, max_lines=3):
     words = text.split()
     lines = []
     current = ""
@@ -61,260 +160,742 @@ def wrap_lines(draw, text, font, max_width, max_lines=3):
 
     return lines
 
+# Taille de titre ajustée, mémorisée par date
+_title_font_cache = {}
+
+def fit_title_font(date_str, margin_x, fallback=None):
+    """
+    Réduit la police du titre (pas de 4, min 32) jusqu'à ce qu'il tienne.
+    Retourne (texte, police, hauteur) ; calculé une fois par date_str.
+    """
+    key = (date_str, margin_x)
+
+    if key not in _title_font_cache:
+        draw = ImageDraw.Draw(Image.new("RGB", (1, 1)))
+        usable_width = WIDTH - SAFE_RIGHT
+        title_text = f"Résultats du {date_str}"
+        font_size = 60
+
+        while True:
+            font = load_font(FONT_BOLD_PATH, font_size, fallback=fallback)
+            tw, th = measure(draw, title_text, font)
+            if tw <= usable_width - margin_x - 20 or font_size <= 32:
+                break
+            font_size -= 4
+
+        _title_font_cache[key] = (title_text, font, th)
+
+    return _title_font_cache[key]
+
 # -------------------------------------------------------------------
 # Gestion des logos (cache + fallback)
 # -------------------------------------------------------------------
 _logo_cache = {}
 
-def load_logo(url, size=(80, 80)):
-    if not url:
-        return Image.new("RGBA", size, (60, 60, 60, 255))
+# Téléchargements en cours : clé → Event, posé une fois le logo en cache.
+# Plusieurs threads (étages du pipeline) ne téléchargent jamais le même logo.
+_logo_downloads = {}
+_logo_downloads_lock = threading.Lock()
+
+# À incrémenter quand la conversion des logos change (variantes stockées périmées)
+# v2 : le repli SVG pur Python refuse ce qu'il ne sait pas rendre
+# v3 : remplissage SVG nonzero (sous-chemins superposés non évidés)
+LOGO_STORE_VERSION = 3
+
+# Stock disque partagé entre runs (None si désactivé)
+_logo_store = (
+    LogoStore(os.path.join(CACHE_DIR, "logos"), LOGO_STORE_MAX_BYTES, LOGO_FAILURE_TTL,
+              version=LOGO_STORE_VERSION)
+    if LOGO_STORE_ENABLED else None
+)
+
+# Tailles utilisées par le rendu
+LOGO_SIZE_COMP = (60, 60)
+TEAM_LOGO_SIZE = (48, 48)
+
+# Statuts 4xx transitoires : pas de marqueur d'échec
+TRANSIENT_CLIENT_STATUSES = {408, 429}
+
+def _placeholder_logo(size):
+    img = Image.new("RGBA", size, (60, 60, 60, 255))
+    img.info["placeholder"] = True
+    return img
 
-    if url in _logo_cache:
-        return _logo_cache[url]
+def is_placeholder(img):
+    return bool(img.info.get("placeholder"))
+
+def _download_logo(url, size):
+    """
+    Logo décodé + miniature (sans toucher au cache mémoire) :
+    - stock disque d'abord (variante déjà redimensionnée)
+    - URL connue comme cassée → placeholder, sans requête
+    - sinon téléchargement (SVG rastérisé), puis écriture dans le stock :
+      chaque SVG n'est converti qu'une fois
+    - échec définitif (4xx, contenu illisible) → marqueur d'échec ;
+      échec transitoire (timeout, connexion, 5xx, 408/429) → placeholder
+      pour ce run seulement, nouvel essai au suivant
+    """
+    if _logo_store:
+        img = _logo_store.get(url, size)
+        if img is not None:
+            return img
+        if _logo_store.is_failed(url):
+            return _placeholder_logo(size)
 
     try:
-        resp = requests.get(url, timeout=8)
+        resp = get_session().get(url, timeout=8)
         resp.raise_for_status()
-        img = Image.open(io.BytesIO(resp.content)).convert("RGBA")
-        img.thumbnail(size, Image.LANCZOS)
+    except HTTPError as e:
+        status = e.response.status_code if e.response is not None else None
+        if _logo_store and status is not None and 400 <= status < 500 \
+                and status not in TRANSIENT_CLIENT_STATUSES:
+            _logo_store.mark_failed(url)
+        return _placeholder_logo(size)
+    except RequestException:
+        return _placeholder_logo(size)
+
+    try:
+        if is_svg(resp.content, resp.headers.get("Content-Type"), url):
+            # Rastérisation directe à la taille cible (pas de miniature floue)
+            img = rasterize_svg(resp.content, size)
+        else:
+            img = Image.open(io.BytesIO(resp.content)).convert("RGBA")
+            img.thumbnail(size, Image.LANCZOS)
     except Exception:
-        img = Image.new("RGBA", size, (60, 60, 60, 255))
+        # Contenu illisible : inutile de le retélécharger à chaque run
+        if _logo_store:
+            _logo_store.mark_failed(url)
+        return _placeholder_logo(size)
+
+    if _logo_store:
+        _logo_store.put(url, size, img)
+
+    return img
+
+def load_logo(url, size=(80, 80)):
+    if not url:
+        return _placeholder_logo(size)
+
+    key = (url, size)
+
+    if key in _logo_cache:
+        return _logo_cache[key]
+
+    img = _download_logo(url, size)
+    _logo_cache[key] = img
+    return img
+
+def load_logo_resized(url, base_size, target_size):
+    """
+    Variante réduite d'un logo (blocs trop serrés pour la taille nominale),
+    mise en cache mémoire + disque comme les tailles nominales.
+    """
+    if not url:
+        return _placeholder_logo(target_size)
+
+    key = (url, base_size, target_size)
+
+    if key in _logo_cache:
+        return _logo_cache[key]
+
+    img = _logo_store.get(url, target_size) if _logo_store else None
 
-    _logo_cache[url] = img
+    if img is None:
+        base = load_logo(url, size=base_size)
+        img = base.copy().resize(target_size, Image.LANCZOS)
+        # Un placeholder n'est jamais stocké : le vrai logo sera retenté
+        if _logo_store and not is_placeholder(base):
+            _logo_store.put(url, target_size, img)
+
+    _logo_cache[key] = img
     return img
 
+def collect_logo_urls(resultat):
+    """Couples (url, taille) de tous les logos utilisés par le rendu."""
+    wanted = {}
+
+    for league_data in resultat.values():
+        matches = league_data.get("matches", [])
+        if not matches:
+            continue
+
+        emblem = league_data.get("competition", {}).get("emblem")
+        if emblem:
+            wanted[(emblem, LOGO_SIZE_COMP)] = None
+
+        for match in matches:
+            for side in ("homeTeam", "awayTeam"):
+                crest = match[side].get("crest")
+                if crest:
+                    wanted[(crest, TEAM_LOGO_SIZE)] = None
+
+    return list(wanted)
+
+def prefetch_logos(resultat, max_workers=LOGO_PREFETCH_WORKERS):
+    """
+    Télécharge, décode et réduit en parallèle tous les logos de `resultat`
+    absents du cache : le rendu ne fait ensuite plus aucun accès réseau.
+    """
+    return _prefetch(collect_logo_urls(resultat), max_workers)
+
+def _page_logo_keys(pages):
+    keys = {}
+    for page in pages:
+        for block in page["blocks"]:
+            if block["emblem"]:
+                keys[(block["emblem"], LOGO_SIZE_COMP)] = None
+            for info in block["matches"]:
+                for crest in (info["home_crest"], info["away_crest"]):
+                    if crest:
+                        keys[(crest, TEAM_LOGO_SIZE)] = None
+
+    return list(keys)
+
+def prefetch_page_logos(pages, max_workers=LOGO_PREFETCH_WORKERS):
+    """Comme prefetch_logos(), limité aux logos de pages déjà mises en page."""
+    return _prefetch(_page_logo_keys(pages), max_workers)
+
+def page_placeholder_logos(page):
+    """URLs des logos de la page remplacés par le placeholder (préchargés au besoin)."""
+    keys = _page_logo_keys([page])
+    _prefetch(keys, LOGO_PREFETCH_WORKERS)
+    return sorted({url for url, size in keys if is_placeholder(_logo_cache[(url, size)])})
+
+def _prefetch(keys, max_workers):
+    """
+    Télécharge les logos absents du cache ; un logo déjà en cours de
+    téléchargement dans un autre thread est attendu, pas redemandé.
+    Retourne le nombre de logos téléchargés par cet appel.
+    """
+    downloaded = 0
+
+    while True:
+        mine, pending = [], []
+
+        with _logo_downloads_lock:
+            for key in keys:
+                if key in _logo_cache:
+                    continue
+                if key in _logo_downloads:
+                    pending.append(_logo_downloads[key])
+                else:
+                    _logo_downloads[key] = threading.Event()
+                    mine.append(key)
+
+        if mine:
+            try:
+                with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+                    images = executor.map(lambda key: _download_logo(*key), mine)
+                    for key, img in zip(mine, images):
+                        _logo_cache[key] = img
+                        downloaded += 1
+            finally:
+                with _logo_downloads_lock:
+                    for key in mine:
+                        _logo_downloads.pop(key).set()
+
+        if not pending:
+            return downloaded
+
+        # Logos d'un autre thread : attendus, puis revérifiés (échec possible)
+        for event in pending:
+            event.wait()
+
 # -------------------------------------------------------------------
-# Génération d'image (version cloud : retourne des bytes)
+# Constantes de mise en page
 # -------------------------------------------------------------------
-def generate_image(resultat: dict, date_str):
-    margin_x = 40
-    block_radius = 24
-    block_padding_top = 48
-    block_padding_bottom = 30
-    logo_size_comp = (60, 60)
-    team_logo_nominal = (48, 48)
-    team_logo_x = margin_x + 40
-
-    block_right = WIDTH - SAFE_RIGHT
-    score_right_margin = 40
-    score_x = block_right - score_right_margin
-
-    text_max_width = block_right - (team_logo_x + team_logo_nominal[0] + 24 + score_right_margin + 20)
-
-    line_spacing = 30
-    inter_team_gap = 8
-    match_vertical_padding = 20
-    league_spacing = 36
-
-    # Polices
-    font_title = load_font(FONT_BOLD_PATH, 60)
-    font_league = load_font(FONT_BOLD_PATH, 46, fallback=font_title)
-    font_team = load_font(FONT_REGULAR_PATH, 36)
-    font_score = load_font(FONT_BOLD_PATH, 44, fallback=font_title)
+MARGIN_X = 40
+BLOCK_RADIUS = 24
+BLOCK_PADDING_TOP = 48
+BLOCK_PADDING_BOTTOM = 30
+HEADER_HEIGHT = 60
+TEAM_LOGO_X = MARGIN_X + 40
 
-    # ---------------------------------------------------------
-    # Nouvelle page
-    # ---------------------------------------------------------
-    def new_canvas(page_num):
-        img = Image.new("RGB", (WIDTH, HEIGHT), (241, 245, 249))
-        draw = ImageDraw.Draw(img)
+BLOCK_RIGHT = WIDTH - SAFE_RIGHT
+SCORE_RIGHT_MARGIN = 40
+SCORE_X = BLOCK_RIGHT - SCORE_RIGHT_MARGIN
 
-        usable_width = WIDTH - SAFE_RIGHT
-        title_text = f"Résultats du {date_str}"
-        font_size = 60
+TEXT_MAX_WIDTH = BLOCK_RIGHT - (TEAM_LOGO_X + TEAM_LOGO_SIZE[0] + 24 + SCORE_RIGHT_MARGIN + 20)
 
-        while True:
-            font_title_dyn = load_font(FONT_BOLD_PATH, font_size, fallback=font_title)
-            tw, th = measure(draw, title_text, font_title_dyn)
-            if tw <= usable_width - margin_x - 20 or font_size <= 32:
-                break
-            font_size -= 4
+LINE_SPACING = 30
+INTER_TEAM_GAP = 8
+MATCH_VERTICAL_PADDING = 20
+LEAGUE_SPACING = 36
+MAX_MATCHES_PER_BLOCK = 6
 
-        draw.text((margin_x, SAFE_TOP), title_text, fill="black", font=font_title_dyn)
-        return img, draw, th, font_title_dyn
+LAYOUT_MODES = ("packed", "league", "block")
 
-    # ---------------------------------------------------------
-    # Début
-    # ---------------------------------------------------------
-    page = 1
-    img, draw, title_h, font_title_dyn = new_canvas(page)
-    y = SAFE_TOP + title_h + 40
+BACKGROUND_COLOR = (241, 245, 249)
+BLOCK_COLOR = (19, 39, 97)
+SCORE_COLOR = (33, 188, 255)
+
+# -------------------------------------------------------------------
+# Polices du rendu (chargées une fois par processus)
+# -------------------------------------------------------------------
+def _fonts():
+    font_title = load_font(FONT_BOLD_PATH, 60)
+    return {
+        "title": font_title,
+        "league": load_font(FONT_BOLD_PATH, 46, fallback=font_title),
+        "team": load_font(FONT_REGULAR_PATH, 36),
+        "score": load_font(FONT_BOLD_PATH, 44, fallback=font_title),
+    }
+
+def _content_top(date_str):
+    """Ordonnée du premier bloc, sous le titre."""
+    fonts = _fonts()
+    _, _, title_h = fit_title_font(date_str, MARGIN_X, fallback=fonts["title"])
+    return SAFE_TOP + title_h + 40
 
-    images_bytes = []
+# -------------------------------------------------------------------
+# Passe 1 : mise en page (blocs → pages), sans dessin
+# -------------------------------------------------------------------
+def _layout_block(draw, league_code, league_data, chunk, fonts):
+    """Bloc d'une ligue (≤ MAX_MATCHES_PER_BLOCK matchs) : hauteurs et textes."""
+    font_team = fonts["team"]
+    total_height = BLOCK_PADDING_TOP + HEADER_HEIGHT
+    match_infos = []
+
+    line_h = measure(draw, "Ay", font_team)[1]
+
+    # Pré-calcul des hauteurs
+    for match in chunk:
+        home_lines = wrap_lines(draw, match["homeTeam"]["name"], font_team, TEXT_MAX_WIDTH)
+        away_lines = wrap_lines(draw, match["awayTeam"]["name"], font_team, TEXT_MAX_WIDTH)
+
+        home_h = len(home_lines) * (line_h + LINE_SPACING)
+        away_h = len(away_lines) * (line_h + LINE_SPACING)
+
+        content_h = home_h + INTER_TEAM_GAP + away_h
+        min_content_h = max(content_h, TEAM_LOGO_SIZE[1] * 2)
+        match_h = min_content_h + 2 * MATCH_VERTICAL_PADDING
+
+        full = match["score"]["fullTime"]
+
+        match_infos.append({
+            "home_crest": match["homeTeam"].get("crest"),
+            "away_crest": match["awayTeam"].get("crest"),
+            "score_home": "-" if full["home"] is None else str(full["home"]),
+            "score_away": "-" if full["away"] is None else str(full["away"]),
+            "home_lines": home_lines,
+            "away_lines": away_lines,
+            "height": match_h,
+            "line_h": line_h
+        })
+
+        total_height += match_h
+
+    total_height += BLOCK_PADDING_BOTTOM
+
+    return {
+        "league_code": league_code,
+        "league_name": league_data.get("name") or league_code,
+        "emblem": league_data.get("competition", {}).get("emblem"),
+        "height": total_height,
+        "matches": match_infos,
+    }
+
+class PagePacker:
+    """
+    Place les blocs sur les pages, dans l'ordre d'arrivée (next-fit) :
+    un bloc rejoint la page courante s'il tient dans HEIGHT - SAFE_BOTTOM,
+    sinon la page est close et une nouvelle commence.
+    Modes :
+    - "packed" : plusieurs ligues par page
+    - "league" : nouvelle page à chaque nouvelle ligue
+    - "block"  : un bloc par page (ancien comportement)
+    add() retourne les pages closes au fil de l'eau ; finish() la dernière.
+    """
+
+    def __init__(self, date_str, mode=LAYOUT_MODE):
+        if mode not in LAYOUT_MODES:
+            raise ValueError(f"Mode de mise en page inconnu : {mode} ({', '.join(LAYOUT_MODES)})")
+
+        self.date_str = date_str
+        self.mode = mode
+        self.content_top = _content_top(date_str)
+        self.bottom_limit = HEIGHT - SAFE_BOTTOM
+        self._blocks = []
+        self._y = self.content_top
+
+    def _new_page_needed(self, block):
+        if not self._blocks:
+            return False
+        if self.mode == "block":
+            return True
+        if self.mode == "league" and block["league_code"] != self._blocks[-1]["league_code"]:
+            return True
+        return self._y + block["height"] > self.bottom_limit
+
+    def add(self, block):
+        closed = []
+
+        if self._new_page_needed(block):
+            closed.append(self._close())
+
+        block["top"] = self._y
+        self._blocks.append(block)
+        self._y += block["height"] + LEAGUE_SPACING
+        return closed
+
+    def _close(self):
+        page = {"date_str": self.date_str, "blocks": self._blocks}
+        self._blocks = []
+        self._y = self.content_top
+        return page
+
+    def finish(self):
+        return [self._close()] if self._blocks else []
+
+def iter_blocks(resultat: dict, fonts=None):
+    """Blocs mis en page (≤ MAX_MATCHES_PER_BLOCK matchs), ligue par ligue."""
+    fonts = fonts or _fonts()
+    draw = ImageDraw.Draw(Image.new("RGB", (1, 1)))
 
-    # ---------------------------------------------------------
-    # Parcours des ligues
-    # ---------------------------------------------------------
     for league_code, league_data in resultat.items():
-
         matches = league_data.get("matches", [])
         if not matches:
             continue
 
-        league_display_name = league_data.get("name") or league_code
-
-        MAX_MATCHES_PER_BLOCK = 6
-        match_chunks = [
-            matches[i:i + MAX_MATCHES_PER_BLOCK]
-            for i in range(0, len(matches), MAX_MATCHES_PER_BLOCK)
-        ]
-
-        # ---------------------------------------------------------
-        # Parcours des chunks
-        # ---------------------------------------------------------
-        for chunk in match_chunks:
-
-            header_height = 60
-            total_height = block_padding_top + header_height
-            match_infos = []
-
-            # Pré-calcul des hauteurs
-            for match in chunk:
-                home = match["homeTeam"]["name"]
-                away = match["awayTeam"]["name"]
-
-                home_lines = wrap_lines(draw, home, font_team, text_max_width)
-                away_lines = wrap_lines(draw, away, font_team, text_max_width)
-
-                line_h = measure(draw, "Ay", font_team)[1]
-                home_h = len(home_lines) * (line_h + line_spacing)
-                away_h = len(away_lines) * (line_h + line_spacing)
+        for i in range(0, len(matches), MAX_MATCHES_PER_BLOCK):
+            chunk = matches[i:i + MAX_MATCHES_PER_BLOCK]
+            yield _layout_block(draw, league_code, league_data, chunk, fonts)
 
-                content_h = home_h + inter_team_gap + away_h
-                min_content_h = max(content_h, team_logo_nominal[1] * 2)
-                match_h = min_content_h + 2 * match_vertical_padding
+def layout_pages(resultat: dict, date_str, mode=LAYOUT_MODE):
+    """
+    Découpe déterministe des ligues en blocs puis en pages (voir PagePacker).
+    Retourne une liste de pages : {"date_str", "blocks": [{..., "top"}]}.
+    Structures simples (dict / list / str / int) : transmissibles aux
+    processus de rendu.
+    """
+    packer = PagePacker(date_str, mode=mode)
+    pages = []
 
-                match_infos.append({
-                    "match": match,
-                    "home_lines": home_lines,
-                    "away_lines": away_lines,
-                    "height": match_h,
-                    "home_h": home_h,
-                    "away_h": away_h,
-                    "line_h": line_h
-                })
+    for block in iter_blocks(resultat):
+        pages.extend(packer.add(block))
 
-                total_height += match_h
+    pages.extend(packer.finish())
+    return pages
 
-            total_height += block_padding_bottom
+# -------------------------------------------------------------------
+# Passe 2 : rendu d'une page → bytes PNG
+# -------------------------------------------------------------------
+# Fond + titre identiques pour toutes les pages d'une date : dessinés une fois.
+# ~6 Mo par date : quelques dates seulement (journées rendues en parallèle)
+_page_templates = LRUCache(4)
 
-            # Nouvelle page si dépassement
-            if y + total_height > HEIGHT - SAFE_BOTTOM:
-                buffer = io.BytesIO()
-                img.save(buffer, format="PNG")
-                buffer.seek(0)
-                images_bytes.append(buffer.getvalue())
+# Fonds de blocs arrondis, par hauteur
+_block_backgrounds = LRUCache(256)
 
-                page += 1
-                img, draw, title_h, font_title_dyn = new_canvas(page)
-                y = SAFE_TOP + title_h + 40
+def _page_template(date_str, fonts):
+    img = _page_templates.get(date_str)
 
-            # ---------------------------------------------------------
-            # Bloc ligue
-            # ---------------------------------------------------------
-            top = y
-            bottom = y + total_height
+    if img is None:
+        img = Image.new("RGB", (WIDTH, HEIGHT), BACKGROUND_COLOR)
+        draw = ImageDraw.Draw(img)
 
-            draw.rounded_rectangle(
-                (margin_x, top, block_right, bottom),
-                radius=block_radius,
-                fill=(19, 39, 97)
-            )
+        title_text, font_title_dyn, _ = fit_title_font(date_str, MARGIN_X, fallback=fonts["title"])
 
-            league_logo_url = league_data.get("competition", {}).get("emblem")
-            league_logo = load_logo(league_logo_url, size=logo_size_comp) if league_logo_url else None
+        draw.text((MARGIN_X, SAFE_TOP), title_text, fill="black", font=font_title_dyn)
+        _page_templates.put(date_str, img)
 
-            lx = margin_x + 24
-            ly = top + 18
+    return img
 
-            if league_logo:
-                img.paste(league_logo, (lx, ly), league_logo)
-                lx += logo_size_comp[0] + 12
+def _block_background(height):
+    """Rectangle arrondi RGBA (transparent hors du bloc) pour une hauteur donnée."""
+    img = _block_backgrounds.get(height)
+
+    if img is None:
+        # Coordonnées inclusives, comme rounded_rectangle sur la page
+        size = (BLOCK_RIGHT - MARGIN_X + 1, height + 1)
+        img = Image.new("RGBA", size, (0, 0, 0, 0))
+        ImageDraw.Draw(img).rounded_rectangle(
+            (0, 0, size[0] - 1, size[1] - 1),
+            radius=BLOCK_RADIUS,
+            fill=BLOCK_COLOR + (255,)
+        )
+        _block_backgrounds.put(height, img)
 
-            draw.text((lx, ly + 8), league_display_name, fill="white", font=font_league)
+    return img
 
-            cursor_y = top + block_padding_top + header_height
+def _new_canvas(date_str, fonts):
+    img = _page_template(date_str, fonts).copy()
+    return img, ImageDraw.Draw(img)
 
-            # ---------------------------------------------------------
-            # Matches du chunk
-            # ---------------------------------------------------------
-            for info in match_infos:
-                match = info["match"]
-                match_h = info["height"]
-                row_top = cursor_y
-                content_area_h = match_h - 2 * match_vertical_padding
-                half_h = content_area_h // 2
+def _draw_block(img, draw, block, fonts):
+    font_team = fonts["team"]
+    font_score = fonts["score"]
 
-                home_logo = load_logo(match["homeTeam"].get("crest"), size=team_logo_nominal)
-                away_logo = load_logo(match["awayTeam"].get("crest"), size=team_logo_nominal)
+    top = block["top"]
 
-                max_logo_h = min(team_logo_nominal[1], half_h)
-                if max_logo_h < team_logo_nominal[1]:
-                    scale = max_logo_h / team_logo_nominal[1]
-                    new_w = max(8, int(team_logo_nominal[0] * scale))
-                    home_logo = home_logo.copy().resize((new_w, max_logo_h), Image.LANCZOS)
-                    away_logo = away_logo.copy().resize((new_w, max_logo_h), Image.LANCZOS)
+    background = _block_background(block["height"])
+    img.paste(background, (MARGIN_X, top), background)
 
-                line_h = info["line_h"]
-                full = match["score"]["fullTime"]
+    league_logo_url = block["emblem"]
+    league_logo = load_logo(league_logo_url, size=LOGO_SIZE_COMP) if league_logo_url else None
 
-                score_home = "-" if full["home"] is None else str(full["home"])
-                score_away = "-" if full["away"] is None else str(full["away"])
+    lx = MARGIN_X + 24
+    ly = top + 18
 
-                # HOME
-                sw_home, sh_home = measure(draw, score_home, font_score)
-                home_text_total_h = len(info["home_lines"]) * (line_h + line_spacing) - line_spacing
-                home_row_h = max(home_logo.size[1], home_text_total_h, sh_home)
+    if league_logo:
+        img.paste(league_logo, (lx, ly), league_logo)
+        lx += LOGO_SIZE_COMP[0] + 12
 
-                home_center_y = row_top + match_vertical_padding + (half_h - home_row_h) // 2
-                home_logo_y = home_center_y + (home_row_h - home_logo.size[1]) // 2
+    draw.text((lx, ly + 8), block["league_name"], fill="white", font=fonts["league"])
 
-                img.paste(home_logo, (team_logo_x, int(home_logo_y)), home_logo)
+    cursor_y = top + BLOCK_PADDING_TOP + HEADER_HEIGHT
 
-                text_x = team_logo_x + max(home_logo.size[0], away_logo.size[0]) + 16
-                ty = home_center_y + (home_row_h - home_text_total_h) // 2
+    # ---------------------------------------------------------
+    # Matches du bloc
+    # ---------------------------------------------------------
+    for info in block["matches"]:
+        match_h = info["height"]
+        row_top = cursor_y
+        content_area_h = match_h - 2 * MATCH_VERTICAL_PADDING
+        half_h = content_area_h // 2
+
+        home_crest = info["home_crest"]
+        away_crest = info["away_crest"]
+
+        home_logo = load_logo(home_crest, size=TEAM_LOGO_SIZE)
+        away_logo = load_logo(away_crest, size=TEAM_LOGO_SIZE)
+
+        max_logo_h = min(TEAM_LOGO_SIZE[1], half_h)
+        if max_logo_h < TEAM_LOGO_SIZE[1]:
+            scale = max_logo_h / TEAM_LOGO_SIZE[1]
+            new_w = max(8, int(TEAM_LOGO_SIZE[0] * scale))
+            home_logo = load_logo_resized(home_crest, TEAM_LOGO_SIZE, (new_w, max_logo_h))
+            away_logo = load_logo_resized(away_crest, TEAM_LOGO_SIZE, (new_w, max_logo_h))
+
+        line_h = info["line_h"]
+        score_home = info["score_home"]
+        score_away = info["score_away"]
+
+        # HOME
+        sw_home, sh_home = measure(draw, score_home, font_score)
+        home_text_total_h = len(info["home_lines"]) * (line_h + LINE_SPACING) - LINE_SPACING
+        home_row_h = max(home_logo.size[1], home_text_total_h, sh_home)
 
-                for line in info["home_lines"]:
-                    draw.text((text_x, ty), line, fill="white", font=font_team)
-                    ty += line_h + line_spacing
+        home_center_y = row_top + MATCH_VERTICAL_PADDING + (half_h - home_row_h) // 2
+        home_logo_y = home_center_y + (home_row_h - home_logo.size[1]) // 2
 
-                score_y = home_center_y + (home_row_h - sh_home) // 2
+        img.paste(home_logo, (TEAM_LOGO_X, int(home_logo_y)), home_logo)
 
-                # 🔧 Correction ici
-                draw.text((score_x - sw_home, score_y), score_home, fill=(33, 188, 255), font=font_score)
+        text_x = TEAM_LOGO_X + max(home_logo.size[0], away_logo.size[0]) + 16
+        ty = home_center_y + (home_row_h - home_text_total_h) // 2
 
-                # AWAY
-                sw_away, sh_away = measure(draw, score_away, font_score)
-                away_text_total_h = len(info["away_lines"]) * (line_h + line_spacing) - line_spacing
-                away_row_h = max(away_logo.size[1], away_text_total_h, sh_away)
+        for line in info["home_lines"]:
+            draw.text((text_x, ty), line, fill="white", font=font_team)
+            ty += line_h + LINE_SPACING
 
-                away_center_y = row_top + match_vertical_padding + half_h + (half_h - away_row_h) // 2
-                away_logo_y = away_center_y + (away_row_h - away_logo.size[1]) // 2
+        score_y = home_center_y + (home_row_h - sh_home) // 2
 
-                img.paste(away_logo, (team_logo_x, int(away_logo_y)), away_logo)
+        # 🔧 Correction ici
+        draw.text((SCORE_X - sw_home, score_y), score_home, fill=SCORE_COLOR, font=font_score)
 
-                ty = away_center_y + (away_row_h - away_text_total_h) // 2
-                for line in info["away_lines"]:
-                    draw.text((text_x, ty), line, fill="white", font=font_team)
-                    ty += line_h + line_spacing
+        # AWAY
+        sw_away, sh_away = measure(draw, score_away, font_score)
+        away_text_total_h = len(info["away_lines"]) * (line_h + LINE_SPACING) - LINE_SPACING
+        away_row_h = max(away_logo.size[1], away_text_total_h, sh_away)
 
-                score_y = away_center_y + (away_row_h - sh_away) // 2
+        away_center_y = row_top + MATCH_VERTICAL_PADDING + half_h + (half_h - away_row_h) // 2
+        away_logo_y = away_center_y + (away_row_h - away_logo.size[1]) // 2
 
-                # 🔧 Correction ici
-                draw.text((score_x - sw_away, score_y), score_away, fill=(33, 188, 255), font=font_score)
+        img.paste(away_logo, (TEAM_LOGO_X, int(away_logo_y)), away_logo)
 
-                cursor_y += match_h
+        ty = away_center_y + (away_row_h - away_text_total_h) // 2
+        for line in info["away_lines"]:
+            draw.text((text_x, ty), line, fill="white", font=font_team)
+            ty += line_h + LINE_SPACING
 
-            y = bottom + league_spacing
+        score_y = away_center_y + (away_row_h - sh_away) // 2
+
+        # 🔧 Correction ici
+        draw.text((SCORE_X - sw_away, score_y), score_away, fill=SCORE_COLOR, font=font_score)
+
+        cursor_y += match_h
+
+def draw_page(page):
+    """Dessine une page mise en page par layout_pages() → Image RGB."""
+    fonts = _fonts()
+    img, draw = _new_canvas(page["date_str"], fonts)
+
+    for block in page["blocks"]:
+        _draw_block(img, draw, block, fonts)
+
+    return img
 
-            buffer = io.BytesIO()
-            img.save(buffer, format="PNG")
-            buffer.seek(0)
-            images_bytes.append(buffer.getvalue())
+# -------------------------------------------------------------------
+# Encodage (PNG / PNG palette / WebP)
+# -------------------------------------------------------------------
+DEFAULT_ENCODING = {
+    "format": PAGE_FORMAT,
+    "compress_level": PNG_COMPRESS_LEVEL,
+    "optimize": PNG_OPTIMIZE,
+    "quantize": PNG_QUANTIZE,
+    "colors": PNG_COLORS,
+    "lossless": WEBP_LOSSLESS,
+    "quality": WEBP_QUALITY,
+}
+
+PAGE_MIMETYPES = {"png": "image/png", "webp": "image/webp"}
+
+def page_extension(encoding=None):
+    return {**DEFAULT_ENCODING, **(encoding or {})}["format"]
+
+def page_mimetype(encoding=None):
+    return PAGE_MIMETYPES[page_extension(encoding)]
+
+def encode_page(img, encoding=None):
+    """
+    Encode une page selon `encoding` (fusionné avec DEFAULT_ENCODING) :
+    - png : compress_level, optimize, quantize (palette adaptative, sans tramage)
+    - webp : lossless ou quality
+    """
+    options = {**DEFAULT_ENCODING, **(encoding or {})}
+    fmt = options["format"]
+
+    if fmt not in PAGE_MIMETYPES:
+        raise ValueError(f"Format de page inconnu : {fmt} ({', '.join(PAGE_MIMETYPES)})")
+
+    if options["quantize"]:
+        # Aplats + texte + petits logos : 256 couleurs suffisent
+        img = img.quantize(
+            colors=options["colors"],
+            method=Image.Quantize.FASTOCTREE,
+            dither=Image.Dither.NONE
+        )
+
+    buffer = io.BytesIO()
+
+    if fmt == "png":
+        img.save(
+            buffer,
+            format="PNG",
+            compress_level=options["compress_level"],
+            optimize=options["optimize"]
+        )
+    else:
+        if img.mode == "P":
+            img = img.convert("RGB")
+        img.save(
+            buffer,
+            format="WEBP",
+            lossless=options["lossless"],
+            quality=options["quality"]
+        )
+
+    return buffer.getvalue()
+
+def render_page(page, encoding=None):
+    """Rendu d'une page mise en page par layout_pages() → bytes encodés."""
+    return encode_page(draw_page(page), encoding)
+
+# -------------------------------------------------------------------
+# Rendu multi-processus
+# -------------------------------------------------------------------
+def _export_logos(pages):
+    """
+    Logos déjà chargés dont les pages ont besoin, en bytes bruts (picklables).
+    Lookups par clé : d'autres threads du pipeline remplissent _logo_cache
+    pendant l'export, le parcourir lèverait une RuntimeError.
+    """
+    logos = {}
+    for key in _page_logo_keys(pages):
+        img = _logo_cache.get(key)
+        if img is not None:
+            logos[key] = (img.mode, img.size, img.tobytes())
+
+    return logos
+
+# "spawn" : un fork pendant que d'autres threads (pipeline, upload) tiennent
+# un verrou (cache texte, logging, stdout) bloquerait le processus enfant
+_MP_CONTEXT = multiprocessing.get_context("spawn")
+
+def _init_render_worker(logos):
+    """Initialiseur des processus : cache logos pré-rempli, aucun réseau."""
+    for key, (mode, size, data) in logos.items():
+        _logo_cache[key] = Image.frombytes(mode, size, data)
+
+def _render_with_logos(page, encoding, logos):
+    _init_render_worker(logos)
+    return render_page(page, encoding)
+
+class PageRenderer:
+    """
+    Rendu page par page, à la demande (pipeline : les pages arrivent au fil
+    de la mise en page). Pool de processus ouvert une fois ; chaque page
+    part avec ses logos, préchargés dans le processus courant.
+    render() peut être appelé depuis plusieurs threads.
+    """
+
+    def __init__(self, workers=RENDER_WORKERS, encoding=None):
+        self.workers = workers
+        self.encoding = encoding
+        self._executor = (
+            ProcessPoolExecutor(max_workers=workers, mp_context=_MP_CONTEXT)
+            if workers > 1 else None
+        )
+
+    def render(self, page):
+        prefetch_page_logos([page])
+
+        if self._executor is None:
+            return render_page(page, self.encoding)
+
+        future = self._executor.submit(
+            _render_with_logos, page, self.encoding, _export_logos([page])
+        )
+        return future.result()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# -------------------------------------------------------------------
+# Empreinte de contenu d'une page (rendu incrémental)
+# -------------------------------------------------------------------
+# À incrémenter à chaque changement visuel du rendu
+# v2 : logos SVG rendus faux par l'ancien repli
+# v3 : remplissage SVG nonzero
+RENDER_VERSION = 3
+
+def page_hash(page, encoding=None, mode=LAYOUT_MODE):
+    """
+    SHA-256 stable d'une page : mise en page (noms, scores, URLs des logos,
+    positions), logos en placeholder et réglages de rendu / encodage.
+    Un logo revenu après un échec change donc l'empreinte.
+    Même empreinte ⇒ mêmes bytes. Le rendu ne dépend pas du numéro de page :
+    le nom de fichier (pageX-Y) est vérifié à part, par le manifeste.
+    """
+    payload = {
+        "version": RENDER_VERSION,
+        "size": [WIDTH, HEIGHT],
+        "mode": mode,
+        "encoding": {**DEFAULT_ENCODING, **(encoding or {})},
+        "page": page,
+        "placeholders": page_placeholder_logos(page),
+    }
+    canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+# -------------------------------------------------------------------
+# Génération d'image (version cloud : retourne des bytes)
+# -------------------------------------------------------------------
+def generate_image(resultat: dict, date_str, workers=RENDER_WORKERS, mode=LAYOUT_MODE,
+                   encoding=None):
+    """Met en page puis rend toutes les pages de la journée → liste de bytes, dans l'ordre."""
+    pages = layout_pages(resultat, date_str, mode=mode)
 
-            page += 1
-            img, draw, title_h, font_title_dyn = new_canvas(page)
-            y = SAFE_TOP + title_h + 40
+    # Logos téléchargés en parallèle avant le dessin
+    prefetch_page_logos(pages)
 
-    return images_bytes
+    with PageRenderer(workers=workers, encoding=encoding) as renderer:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            return list(executor.map(renderer.render, pages))
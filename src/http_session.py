@@ -0,0 +1,59 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from src.config import HTTP_POOL_SIZE, HTTP_RETRIES
+
+# ---------------------------------------------------------
+# Session HTTP partagée (API football-data + CDN des logos)
+# ---------------------------------------------------------
+_session = None
+_session_lock = threading.Lock()
+
+
+def _build_session(pool_size, retries):
+    """
+    Session requests avec :
+    - keep-alive (connexions TCP/TLS réutilisées)
+    - pool de pool_size connexions par hôte
+    - retries + backoff sur les erreurs serveur (5xx), au niveau adapter
+    """
+
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=retries,
+        status=retries,
+        backoff_factor=0.5,
+        status_forcelist=(500, 502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+        # La réponse finale est rendue à l'appelant, qui gère lui-même le statut
+        raise_on_status=False,
+    )
+
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=retry,
+    )
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session():
+    """Retourne la session partagée du processus (créée au premier appel)."""
+
+    global _session
+
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session(HTTP_POOL_SIZE, HTTP_RETRIES)
+
+    return _session
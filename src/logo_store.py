@@ -0,0 +1,154 @@
+import os
+import json
+import time
+import hashlib
+import threading
+
+from PIL import Image
+
+# ---------------------------------------------------------
+# Stock disque des logos (clé = hash de l'URL + taille)
+# ---------------------------------------------------------
+class LogoStore:
+    """
+    Logos déjà décodés et redimensionnés, en PNG RGBA :
+    - <sha1(url)>_<w>x<h>.png : une variante par taille utilisée
+    - <sha1(url)>.fail : URL en échec (pas de nouvel essai avant failure_ttl)
+    Éviction LRU (date d'accès = mtime) dès que max_bytes est dépassé.
+    Le dossier peut être restauré entre deux runs CI.
+    version > 1 : nouvelles clés, les fichiers des versions précédentes ne
+    sont plus lus et finissent évincés.
+    """
+
+    def __init__(self, root, max_bytes, failure_ttl, version=1):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.failure_ttl = failure_ttl
+        self.version = version
+        self._lock = threading.Lock()
+        self._total_bytes = None
+
+    def _key(self, url):
+        if self.version > 1:
+            url = f"v{self.version}:{url}"
+        return hashlib.sha1(url.encode("utf-8")).hexdigest()
+
+    def _variant_path(self, url, size):
+        return os.path.join(self.root, f"{self._key(url)}_{size[0]}x{size[1]}.png")
+
+    def _failure_path(self, url):
+        return os.path.join(self.root, f"{self._key(url)}.fail")
+
+    def _write_atomic(self, path, write):
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        write(tmp_path)
+        os.replace(tmp_path, path)
+
+    # -----------------------------------------------------
+    # Variantes redimensionnées
+    # -----------------------------------------------------
+    def get(self, url, size):
+        path = self._variant_path(url, size)
+
+        try:
+            with Image.open(path) as img:
+                img.load()
+                logo = img.convert("RGBA")
+            # Accès = rafraîchissement pour l'éviction LRU
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+
+        return logo
+
+    def put(self, url, size, img):
+        path = self._variant_path(url, size)
+
+        try:
+            self._write_atomic(path, lambda tmp: img.save(tmp, format="PNG"))
+            written = os.path.getsize(path)
+        except OSError:
+            return
+
+        with self._lock:
+            if self._total_bytes is not None:
+                self._total_bytes += written
+            over = self._current_size() > self.max_bytes
+
+        if over:
+            self.evict()
+
+    # -----------------------------------------------------
+    # URLs en échec
+    # -----------------------------------------------------
+    def is_failed(self, url):
+        try:
+            age = time.time() - os.path.getmtime(self._failure_path(url))
+        except OSError:
+            return False
+        return age < self.failure_ttl
+
+    def mark_failed(self, url):
+        payload = json.dumps({"url": url, "failed_at": time.time()})
+
+        def write(tmp):
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(payload)
+
+        try:
+            self._write_atomic(self._failure_path(url), write)
+        except OSError:
+            pass
+
+    # -----------------------------------------------------
+    # Éviction LRU
+    # -----------------------------------------------------
+    def _entries(self):
+        entries = []
+        try:
+            names = os.listdir(self.root)
+        except OSError:
+            return entries
+
+        for name in names:
+            if not name.endswith(".png"):
+                continue
+            path = os.path.join(self.root, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+
+        return entries
+
+    def _current_size(self):
+        # Appelé sous verrou ; calculé une seule fois puis tenu à jour
+        if self._total_bytes is None:
+            self._total_bytes = sum(size for _, size, _ in self._entries())
+        return self._total_bytes
+
+    def evict(self):
+        """Supprime les variantes les moins récemment utilisées (jusqu'à 90 % du budget)."""
+        with self._lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            target = int(self.max_bytes * 0.9)
+            removed = 0
+
+            for _, size, path in entries:
+                if total <= target:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                removed += 1
+
+            self._total_bytes = total
+
+        if removed:
+            print(f"[INFO] Stock logos : {removed} variante(s) évincée(s).")
+        return removed
@@ -0,0 +1,237 @@
+import os
+import json
+import time
+import threading
+
+from src.config import CHECKPOINT_DIR, CHECKPOINT_INTERVAL
+from src.drive_uploader import (
+    download_json_bytes_by_id,
+    drive_delete_files,
+    drive_rename_files,
+    get_folder_index,
+    upload_json_bytes
+)
+
+# ---------------------------------------------------------
+# Manifeste / point de reprise d'une journée
+# ---------------------------------------------------------
+class PageManifest:
+    """
+    JSON stocké dans Drive à côté du JSON de résultats (copie locale dans
+    CHECKPOINT_DIR) :
+    {"saved_at", "leagues": {code: données}, "pages": {empreinte: {"file_id", "name"}}}
+    - leagues : ligues déjà extraites, tant que le JSON de résultats n'est
+      pas uploadé → un run relancé ne les redemande pas à l'API
+    - pages : pages publiées ; une page dont l'empreinte est connue (et le
+      fichier toujours présent) n'est ni re-rendue ni re-uploadée, au plus
+      renommée par finalize()
+    - finalize() donne aux pages leur nom définitif (pageX-Y)
+    - prune() met à la corbeille les pages d'une mise en page périmée
+    Sauvegardé au fil du run (checkpoint()) : un run interrompu reprend là
+    où il s'est arrêté.
+    """
+
+    def __init__(self, filename, folder_id, png_folder_id, local_dir=CHECKPOINT_DIR,
+                 interval=CHECKPOINT_INTERVAL):
+        self.filename = filename
+        self.folder_id = folder_id
+        self.png_folder_id = png_folder_id
+        self.local_path = os.path.join(local_dir, filename) if local_dir else None
+        self.interval = interval
+        self.saved_at = 0.0
+        self.leagues = {}
+        self.pages = {}
+        # Fichiers remplacés (même contenu republié sous un autre nom)
+        self._replaced = set()
+        # Fichiers déjà mis à la corbeille par finalize() : prune() les ignore
+        self._trashed = set()
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._uploaded_at = 0.0
+
+    @classmethod
+    def load(cls, filename, folder_id, png_folder_id, **kwargs):
+        """Copie Drive ou copie locale, la plus récente des deux."""
+        manifest = cls(filename, folder_id, png_folder_id, **kwargs)
+        candidates = []
+
+        file_id = get_folder_index(folder_id).find_id(filename)
+        if file_id:
+            candidates.append(json.loads(download_json_bytes_by_id(file_id).decode("utf-8")))
+
+        if manifest.local_path:
+            try:
+                with open(manifest.local_path, "r", encoding="utf-8") as f:
+                    candidates.append(json.load(f))
+            except (OSError, ValueError):
+                pass
+
+        if candidates:
+            data = max(candidates, key=lambda d: d.get("saved_at", 0))
+            manifest.saved_at = data.get("saved_at", 0)
+            manifest.leagues = data.get("leagues", {})
+            manifest.pages = data.get("pages", {})
+
+        return manifest
+
+    # -----------------------------
+    # Ligues extraites
+    # -----------------------------
+    def record_leagues(self, resultat):
+        with self._lock:
+            self.leagues.update(resultat)
+
+    def clear_leagues(self):
+        """JSON de résultats uploadé : les données brutes ne sont plus utiles."""
+        with self._lock:
+            self.leagues = {}
+
+    # -----------------------------
+    # Pages publiées
+    # -----------------------------
+    def published_id(self, page_hash):
+        """ID Drive de la page déjà publiée avec cette empreinte (sous n'importe quel nom), sinon None."""
+        entry = self.pages.get(page_hash)
+        if not entry:
+            return None
+
+        # Le fichier a pu être supprimé / remplacé à la main depuis
+        if get_folder_index(self.png_folder_id).find_id(entry["name"]) != entry["file_id"]:
+            return None
+
+        return entry["file_id"]
+
+    def record(self, page_hash, name, file_id):
+        with self._lock:
+            previous = self.pages.get(page_hash)
+            if previous and previous["file_id"] != file_id:
+                self._replaced.add(previous["file_id"])
+
+            self.pages[page_hash] = {"file_id": file_id, "name": name}
+
+    def finalize(self, final_names):
+        """
+        Renomme les pages vers leur nom définitif : {empreinte: nom}.
+        Un autre fichier qui porte déjà l'un de ces noms (ancienne version
+        de la page) est d'abord mis à la corbeille.
+        Retourne le nombre de pages renommées ; lève si un renommage échoue.
+        """
+        index = get_folder_index(self.png_folder_id)
+
+        with self._lock:
+            entries = {h: self.pages[h] for h in final_names if h in self.pages}
+            current_ids = {e["file_id"] for e in entries.values()}
+            renames = {
+                e["file_id"]: final_names[h]
+                for h, e in entries.items()
+                if e["name"] != final_names[h]
+            }
+
+        squatters = [
+            file_id
+            for file_id in (index.find_id(name) for name in final_names.values())
+            if file_id and file_id not in current_ids
+        ]
+        if squatters:
+            done = drive_delete_files(squatters, trash=True)
+            with self._lock:
+                self._trashed.update(file_id for file_id, ok in done.items() if ok)
+
+        if not renames:
+            return 0
+
+        done = drive_rename_files(renames)
+
+        with self._lock:
+            for h, e in entries.items():
+                if done.get(e["file_id"]):
+                    e["name"] = final_names[h]
+
+        failed = [file_id for file_id, ok in done.items() if not ok]
+        if failed:
+            raise RuntimeError(f"[ERREUR DRIVE] {len(failed)} page(s) non renommée(s)")
+
+        return len(renames)
+
+    def prune(self, current_hashes):
+        """Oublie les empreintes périmées et met leurs fichiers à la corbeille."""
+        current_hashes = set(current_hashes)
+
+        with self._lock:
+            stale = {h: e for h, e in self.pages.items() if h not in current_hashes}
+
+            # Un fichier mis à jour en place (upsert) porte encore une page courante
+            current_ids = {e["file_id"] for h, e in self.pages.items() if h in current_hashes}
+            candidates = [e["file_id"] for e in stale.values()] + sorted(self._replaced)
+            to_delete = list(dict.fromkeys(
+                i for i in candidates if i not in current_ids and i not in self._trashed
+            ))
+
+        if to_delete:
+            drive_delete_files(to_delete, trash=True)
+
+        with self._lock:
+            for h in stale:
+                self.pages.pop(h, None)
+            self._replaced.difference_update(to_delete)
+
+        return to_delete
+
+    # -----------------------------
+    # Sauvegarde
+    # -----------------------------
+    def _snapshot(self):
+        with self._lock:
+            self.saved_at = time.time()
+            data = {"saved_at": self.saved_at, "leagues": self.leagues, "pages": self.pages}
+            return json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+
+    def _write_local(self, data):
+        if not self.local_path:
+            return
+
+        os.makedirs(os.path.dirname(self.local_path), exist_ok=True)
+        tmp_path = f"{self.local_path}.{threading.get_ident()}.tmp"
+
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, self.local_path)
+
+    def checkpoint(self):
+        """
+        Sauvegarde en cours de run : copie locale à chaque appel, copie Drive
+        au plus une fois par `interval` secondes. Sans effet si une
+        sauvegarde est déjà en cours dans un autre thread.
+        Ne lève jamais : un point de reprise raté ne doit pas interrompre
+        le run (la sauvegarde suivante, ou save(), rattrapera).
+        """
+        if not self._save_lock.acquire(blocking=False):
+            return False
+
+        try:
+            data = self._snapshot()
+
+            try:
+                self._write_local(data)
+            except OSError as e:
+                print(f"[ERREUR] Point de reprise local {self.filename} non écrit : {e}")
+
+            if time.monotonic() - self._uploaded_at >= self.interval:
+                try:
+                    upload_json_bytes(data, self.filename, self.folder_id, upsert=True)
+                    self._uploaded_at = time.monotonic()
+                except Exception as e:
+                    print(f"[ERREUR DRIVE] Point de reprise {self.filename} non sauvegardé : {e}")
+                    return False
+            return True
+        finally:
+            self._save_lock.release()
+
+    def save(self):
+        """Sauvegarde complète (locale + Drive), en fin d'étape ou de run."""
+        with self._save_lock:
+            data = self._snapshot()
+            self._write_local(data)
+            result = upload_json_bytes(data, self.filename, self.folder_id, upsert=True)
+            self._uploaded_at = time.monotonic()
+            return result
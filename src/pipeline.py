@@ -0,0 +1,272 @@
+import time
+import queue
+import threading
+from collections import OrderedDict
+
+# ---------------------------------------------------------
+# Moteur de pipeline : étages reliés par des files bornées
+# ---------------------------------------------------------
+# Fin de flux, envoyée à chaque worker de l'étage suivant
+_END = object()
+
+# Attente max sur une file avant de revérifier l'annulation (secondes)
+_POLL = 0.1
+
+
+class PipelineError(RuntimeError):
+    """Échec d'un étage : le pipeline est annulé, l'erreur d'origine est chaînée."""
+
+
+class Stage:
+    """
+    Étage de pipeline.
+    - func(item) → résultat (1 pour 1), ou itérable de résultats si fanout
+    - workers : threads de l'étage (1 si ordered)
+    - ordered : items traités dans l'ordre d'entrée (tampon de réordonnancement)
+    - fanout : func produit 0..n résultats, renumérotés dans l'ordre (implique ordered)
+    - flush() : appelé une fois l'entrée épuisée, itérable de derniers résultats (fanout)
+    Un étage consomme son entrée en continu : attendre un événement produit
+    en aval de files bornées bloquerait tout le pipeline.
+    """
+
+    def __init__(self, name, func, workers=1, ordered=False, fanout=False, flush=None):
+        if flush is not None and not fanout:
+            raise ValueError(f"Étage {name} : flush() réservé aux étages fanout")
+
+        self.name = name
+        self.func = func
+        self.ordered = ordered or fanout
+        self.fanout = fanout
+        self.flush = flush
+        self.workers = 1 if self.ordered else max(1, workers)
+
+
+class StageStats:
+    """Temps cumulés (tous workers) : occupé, en attente d'entrée, bloqué en sortie."""
+
+    def __init__(self, name, workers):
+        self.name = name
+        self.workers = workers
+        self.items_in = 0
+        self.items_out = 0
+        self.busy = 0.0
+        self.idle = 0.0
+        self.blocked = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, **values):
+        with self._lock:
+            for key, value in values.items():
+                setattr(self, key, getattr(self, key) + value)
+
+    def as_dict(self, wall):
+        capacity = wall * self.workers
+        return {
+            "workers": self.workers,
+            "items_in": self.items_in,
+            "items_out": self.items_out,
+            "busy_s": round(self.busy, 3),
+            "idle_s": round(self.idle, 3),
+            "blocked_s": round(self.blocked, 3),
+            "utilisation": round(self.busy / capacity, 3) if capacity else 0.0,
+        }
+
+
+class Pipeline:
+    """
+    Enchaîne des étages : chaque étage lit la file de l'étage précédent et
+    écrit dans la sienne (au plus queue_size éléments en attente), donc
+    un étage lent freine ses producteurs au lieu d'accumuler en mémoire.
+    run(items) retourne les sorties du dernier étage, dans l'ordre.
+    stats() / report() : temps occupé / attente / blocage par étage,
+    l'étage le plus occupé est le goulot d'étranglement.
+    """
+
+    def __init__(self, stages, queue_size=8):
+        if not stages:
+            raise ValueError("Pipeline sans étage")
+
+        self.stages = list(stages)
+        self.queue_size = max(1, queue_size)
+        self.wall = 0.0
+        self._stats = [StageStats(stage.name, stage.workers) for stage in self.stages]
+
+    # -----------------------------
+    # Files avec annulation
+    # -----------------------------
+    def _put(self, q, item):
+        while not self._abort.is_set():
+            try:
+                q.put(item, timeout=_POLL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q):
+        while not self._abort.is_set():
+            try:
+                return q.get(timeout=_POLL)
+            except queue.Empty:
+                continue
+        return _END
+
+    def _fail(self, stage, error):
+        with self._error_lock:
+            if self._error is None:
+                self._error = (stage.name, error)
+        self._abort.set()
+
+    # -----------------------------
+    # Worker d'un étage
+    # -----------------------------
+    def _emit(self, index, seq, result):
+        stats = self._stats[index]
+        start = time.perf_counter()
+        ok = self._put(self._queues[index + 1], (seq, result))
+        stats.add(blocked=time.perf_counter() - start, items_out=1)
+        return ok
+
+    def _process(self, index, seq, item):
+        stage = self.stages[index]
+        stats = self._stats[index]
+
+        if not stage.fanout:
+            start = time.perf_counter()
+            result = stage.func(item)
+            stats.add(busy=time.perf_counter() - start)
+            return self._emit(index, seq, result)
+
+        # Fanout : le temps passé dans le générateur compte comme occupé
+        results = iter(stage.func(item) if item is not _END else stage.flush())
+        while True:
+            start = time.perf_counter()
+            try:
+                result = next(results)
+            except StopIteration:
+                stats.add(busy=time.perf_counter() - start)
+                return True
+            stats.add(busy=time.perf_counter() - start)
+
+            if not self._emit(index, self._next_out[index], result):
+                return False
+            self._next_out[index] += 1
+
+    def _worker(self, index):
+        stage = self.stages[index]
+        stats = self._stats[index]
+        inbox = self._queues[index]
+        pending = {}
+        next_seq = 0
+
+        try:
+            while True:
+                start = time.perf_counter()
+                entry = self._get(inbox)
+                stats.add(idle=time.perf_counter() - start)
+
+                if entry is _END:
+                    break
+
+                seq, item = entry
+                stats.add(items_in=1)
+
+                if not stage.ordered:
+                    if not self._process(index, seq, item):
+                        return
+                    continue
+
+                # Réordonnancement : on ne traite que l'item attendu
+                pending[seq] = item
+                while next_seq in pending:
+                    if not self._process(index, next_seq, pending.pop(next_seq)):
+                        return
+                    next_seq += 1
+
+            if self._abort.is_set():
+                return
+
+            if stage.flush is not None:
+                if not self._process(index, None, _END):
+                    return
+
+        except Exception as e:
+            self._fail(stage, e)
+            return
+
+        # Dernier worker de l'étage : fin de flux pour l'étage suivant
+        with self._done_lock:
+            self._done[index] += 1
+            last = self._done[index] == stage.workers
+
+        if last:
+            downstream = self.stages[index + 1].workers if index + 1 < len(self.stages) else 1
+            for _ in range(downstream):
+                if not self._put(self._queues[index + 1], _END):
+                    return
+
+    # -----------------------------
+    # Exécution
+    # -----------------------------
+    def run(self, items):
+        self._abort = threading.Event()
+        self._error = None
+        self._error_lock = threading.Lock()
+        self._done_lock = threading.Lock()
+        self._done = [0] * len(self.stages)
+        self._next_out = [0] * len(self.stages)
+        # Dernière file non bornée : consommée par run() après les étages
+        self._queues = [queue.Queue(self.queue_size) for _ in self.stages] + [queue.Queue()]
+
+        started = time.perf_counter()
+
+        threads = [
+            threading.Thread(target=self._worker, args=(index,), daemon=True,
+                             name=f"pipeline-{stage.name}-{n}")
+            for index, stage in enumerate(self.stages)
+            for n in range(stage.workers)
+        ]
+        for thread in threads:
+            thread.start()
+
+        # Source : items numérotés dans l'ordre d'arrivée
+        for seq, item in enumerate(items):
+            if not self._put(self._queues[0], (seq, item)):
+                break
+        else:
+            for _ in range(self.stages[0].workers):
+                self._put(self._queues[0], _END)
+
+        outputs = OrderedDict()
+        while True:
+            entry = self._get(self._queues[-1])
+            if entry is _END:
+                break
+            seq, result = entry
+            outputs[seq] = result
+
+        for thread in threads:
+            thread.join()
+
+        self.wall = time.perf_counter() - started
+
+        if self._error is not None:
+            name, error = self._error
+            raise PipelineError(f"Étage {name} en échec : {error}") from error
+
+        return [outputs[seq] for seq in sorted(outputs)]
+
+    def stats(self):
+        return {s.name: s.as_dict(self.wall) for s in self._stats}
+
+    def report(self):
+        """Une ligne par étage, pour les logs."""
+        lines = [f"Pipeline : {self.wall:.2f}s"]
+        for name, s in self.stats().items():
+            lines.append(
+                f"  {name:<8} ×{s['workers']:<2} "
+                f"in={s['items_in']:<4} out={s['items_out']:<4} "
+                f"occupé={s['busy_s']:.2f}s attente={s['idle_s']:.2f}s "
+                f"bloqué={s['blocked_s']:.2f}s ({s['utilisation']:.0%})"
+            )
+        return "\n".join(lines)
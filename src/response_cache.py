@@ -0,0 +1,99 @@
+import os
+import json
+import time
+import hashlib
+import threading
+
+# ---------------------------------------------------------
+# Cache disque des réponses API (clé = URL complète)
+# ---------------------------------------------------------
+class ResponseCache:
+    """
+    Une entrée = un fichier JSON :
+    {"url", "data", "etag", "last_modified", "stored_at", "expires_at"}
+    - expires_at = None → entrée valable indéfiniment
+    - une entrée expirée reste utilisable pour une requête conditionnelle
+      (If-None-Match / If-Modified-Since)
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "revalidated": 0, "stores": 0}
+
+    def _path(self, url):
+        key = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _count(self, name):
+        with self._lock:
+            self._stats[name] += 1
+
+    def get(self, url):
+        """Retourne l'entrée (fraîche ou expirée) ou None."""
+        try:
+            with open(self._path(url), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        return entry if entry.get("url") == url else None
+
+    def is_fresh(self, entry):
+        expires_at = entry.get("expires_at")
+        return expires_at is None or time.time() < expires_at
+
+    def lookup(self, url):
+        """
+        Retourne (entrée, fraîche). Compte un hit si l'entrée est fraîche,
+        un miss sinon (la requête réseau devient nécessaire).
+        """
+        entry = self.get(url)
+
+        if entry is not None and self.is_fresh(entry):
+            self._count("hits")
+            return entry, True
+
+        self._count("misses")
+        return entry, False
+
+    def store(self, url, data, ttl, etag=None, last_modified=None):
+        now = time.time()
+        entry = {
+            "url": url,
+            "data": data,
+            "etag": etag,
+            "last_modified": last_modified,
+            "stored_at": now,
+            "expires_at": None if ttl is None else now + ttl,
+        }
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(url)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+        self._count("stores")
+        return entry
+
+    def revalidated(self, entry, ttl):
+        """Réponse 304 : on prolonge l'entrée existante."""
+        self._count("revalidated")
+        return self.store(
+            entry["url"],
+            entry["data"],
+            ttl,
+            etag=entry.get("etag"),
+            last_modified=entry.get("last_modified"),
+        )
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
@@ -0,0 +1,539 @@
+import io
+import re
+import math
+import xml.etree.ElementTree as ET
+
+from PIL import Image, ImageDraw
+
+# Rastériseur natif optionnel (pip install cairosvg + libcairo)
+try:
+    import cairosvg
+except (ImportError, OSError):
+    cairosvg = None
+
+# ---------------------------------------------------------
+# Détection
+# ---------------------------------------------------------
+def is_svg(content, content_type=None, url=None):
+    """SVG si le Content-Type, l'extension ou le début du contenu l'indique."""
+    if content_type and "svg" in content_type.lower():
+        return True
+    if url and url.lower().split("?", 1)[0].endswith(".svg"):
+        return True
+
+    head = content[:512].lstrip().lower()
+    return head.startswith(b"<svg") or (head.startswith(b"<?xml") and b"<svg" in head)
+
+
+# ---------------------------------------------------------
+# Rastériseurs enregistrés (le premier qui réussit gagne)
+# ---------------------------------------------------------
+_rasterizers = []
+
+def register_rasterizer(func, first=True):
+    """
+    func(svg_bytes, size) → Image RGBA tenant dans size, ou None.
+    first=True : prioritaire sur les rastériseurs déjà enregistrés.
+    """
+    if first:
+        _rasterizers.insert(0, func)
+    else:
+        _rasterizers.append(func)
+
+
+def rasterize_svg(svg_bytes, size):
+    """Rastérise un SVG directement à la taille cible (ratio conservé)."""
+    errors = []
+
+    for rasterizer in _rasterizers:
+        try:
+            img = rasterizer(svg_bytes, size)
+        except Exception as e:
+            errors.append(e)
+            continue
+        if img is not None:
+            return img
+
+    raise ValueError(f"SVG non rastérisable : {errors}")
+
+
+def _fit(size, width, height):
+    """Taille (w, h) qui tient dans size en gardant le ratio width/height."""
+    scale = min(size[0] / width, size[1] / height)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+# ---------------------------------------------------------
+# Rastériseur cairosvg (si disponible)
+# ---------------------------------------------------------
+def _rasterize_cairosvg(svg_bytes, size):
+    root = ET.fromstring(svg_bytes)
+    _, _, vb_w, vb_h = _viewbox(root)
+    out_w, out_h = _fit(size, vb_w, vb_h)
+
+    png = cairosvg.svg2png(bytestring=svg_bytes, output_width=out_w, output_height=out_h)
+    return Image.open(io.BytesIO(png)).convert("RGBA")
+
+
+# ---------------------------------------------------------
+# Rastériseur pur Python (repli)
+# ---------------------------------------------------------
+# Formes simples (rect, circle, ellipse, line, polyline, polygon, path sans
+# arc), couleurs pleines, opacité, transformations, groupes.
+# Suréchantillonnage ×4 pour l'anticrénelage.
+# Tout le reste (feuilles de style / class, <use>, arcs, dégradés, texte,
+# clipPath, masques, filtres…) → None : le logo retombe sur le placeholder
+# plutôt que d'être rendu (et stocké) faux.
+SUPERSAMPLE = 4
+CURVE_STEPS = 12
+
+NAMED_COLORS = {
+    "black": (0, 0, 0), "white": (255, 255, 255), "red": (255, 0, 0),
+    "green": (0, 128, 0), "blue": (0, 0, 255), "yellow": (255, 255, 0),
+    "gray": (128, 128, 128), "grey": (128, 128, 128), "orange": (255, 165, 0),
+    "navy": (0, 0, 128), "maroon": (128, 0, 0), "gold": (255, 215, 0),
+    "silver": (192, 192, 192), "purple": (128, 0, 128), "darkblue": (0, 0, 139),
+    "darkred": (139, 0, 0), "darkgreen": (0, 100, 0), "skyblue": (135, 206, 235),
+}
+
+_NUMBER_RE = re.compile(r"[-+]?(?:\d*\.\d+|\d+\.?)(?:[eE][-+]?\d+)?")
+_PATH_TOKEN_RE = re.compile(r"[MmLlHhVvCcSsQqTtAaZz]|[-+]?(?:\d*\.\d+|\d+\.?)(?:[eE][-+]?\d+)?")
+_TRANSFORM_RE = re.compile(r"(matrix|translate|scale|rotate|skewX|skewY)\s*\(([^)]*)\)")
+
+IDENTITY = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+
+
+class UnsupportedSVG(ValueError):
+    """Construction SVG hors du périmètre du rastériseur pur Python."""
+
+
+def _local(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def _numbers(text):
+    return [float(n) for n in _NUMBER_RE.findall(text or "")]
+
+
+def _length(value, default=0.0):
+    nums = _numbers(value)
+    return nums[0] if nums else default
+
+
+def _viewbox(root):
+    nums = _numbers(root.get("viewBox"))
+    if len(nums) == 4 and nums[2] > 0 and nums[3] > 0:
+        return tuple(nums)
+
+    width = _length(root.get("width"), 100.0) or 100.0
+    height = _length(root.get("height"), 100.0) or 100.0
+    return 0.0, 0.0, width, height
+
+
+def _multiply(m1, m2):
+    a1, b1, c1, d1, e1, f1 = m1
+    a2, b2, c2, d2, e2, f2 = m2
+    return (
+        a1 * a2 + c1 * b2,
+        b1 * a2 + d1 * b2,
+        a1 * c2 + c1 * d2,
+        b1 * c2 + d1 * d2,
+        a1 * e2 + c1 * f2 + e1,
+        b1 * e2 + d1 * f2 + f1,
+    )
+
+
+def _parse_transform(text):
+    matrix = IDENTITY
+
+    for name, args in _TRANSFORM_RE.findall(text or ""):
+        v = _numbers(args)
+
+        if name == "matrix" and len(v) == 6:
+            m = tuple(v)
+        elif name == "translate" and v:
+            m = (1, 0, 0, 1, v[0], v[1] if len(v) > 1 else 0)
+        elif name == "scale" and v:
+            m = (v[0], 0, 0, v[1] if len(v) > 1 else v[0], 0, 0)
+        elif name == "rotate" and v:
+            a = math.radians(v[0])
+            cos, sin = math.cos(a), math.sin(a)
+            m = (cos, sin, -sin, cos, 0, 0)
+            if len(v) == 3:
+                m = _multiply(_multiply((1, 0, 0, 1, v[1], v[2]), m), (1, 0, 0, 1, -v[1], -v[2]))
+        elif name == "skewX" and v:
+            m = (1, 0, math.tan(math.radians(v[0])), 1, 0, 0)
+        elif name == "skewY" and v:
+            m = (1, math.tan(math.radians(v[0])), 0, 1, 0, 0)
+        else:
+            continue
+
+        matrix = _multiply(matrix, m)
+
+    return matrix
+
+
+def _apply(matrix, x, y):
+    a, b, c, d, e, f = matrix
+    return a * x + c * y + e, b * x + d * y + f
+
+
+def _parse_color(value):
+    """Retourne (r, g, b), None pour 'none', ou False si non reconnu."""
+    if value is None:
+        return False
+
+    value = value.strip()
+    lower = value.lower()
+
+    if lower in ("none", "transparent"):
+        return None
+
+    if lower.startswith("#"):
+        hex_part = lower[1:]
+        if len(hex_part) in (3, 4):
+            hex_part = "".join(ch * 2 for ch in hex_part[:3])
+        if len(hex_part) >= 6:
+            try:
+                return tuple(int(hex_part[i:i + 2], 16) for i in (0, 2, 4))
+            except ValueError:
+                return False
+        return False
+
+    if lower.startswith("rgb"):
+        nums = _numbers(value)
+        if len(nums) >= 3:
+            if "%" in value:
+                nums = [n * 2.55 for n in nums]
+            return tuple(max(0, min(255, int(round(n)))) for n in nums[:3])
+        return False
+
+    return NAMED_COLORS.get(lower, False)
+
+
+def _attributes(elem):
+    """Attributs de présentation + propriétés de l'attribut style."""
+    attrs = dict(elem.attrib)
+
+    for decl in (elem.get("style") or "").split(";"):
+        if ":" in decl:
+            key, value = decl.split(":", 1)
+            attrs[key.strip()] = value.strip()
+
+    return attrs
+
+
+# Éléments / attributs que le repli ne sait pas rendre fidèlement
+UNSUPPORTED_TAGS = {
+    "style", "use", "symbol", "clipPath", "mask", "filter", "pattern", "image",
+    "text", "foreignObject", "linearGradient", "radialGradient", "marker",
+}
+UNSUPPORTED_ATTRS = {"class", "clip-path", "mask", "filter", "marker-start", "marker-mid", "marker-end"}
+
+
+def _check_supported(root):
+    """Lève UnsupportedSVG à la première construction non gérée."""
+    for elem in root.iter():
+        tag = _local(elem.tag)
+        if tag in UNSUPPORTED_TAGS:
+            raise UnsupportedSVG(f"<{tag}>")
+
+        attrs = _attributes(elem)
+        for name in attrs:
+            if _local(name) in UNSUPPORTED_ATTRS:
+                raise UnsupportedSVG(f"attribut {_local(name)}")
+
+        for name in ("fill", "stroke"):
+            if name in attrs and _parse_color(attrs[name]) is False:
+                raise UnsupportedSVG(f"{name}={attrs[name]!r}")
+
+        if tag == "path" and re.search(r"[Aa]", attrs.get("d") or ""):
+            raise UnsupportedSVG("arc")
+
+
+def _ellipse_points(cx, cy, rx, ry, steps=48):
+    return [
+        (cx + rx * math.cos(2 * math.pi * i / steps), cy + ry * math.sin(2 * math.pi * i / steps))
+        for i in range(steps)
+    ]
+
+
+def _path_subpaths(d):
+    """Découpe un attribut d en sous-chemins [(points, fermé)], courbes aplaties."""
+    tokens = _PATH_TOKEN_RE.findall(d or "")
+    subpaths = []
+    points = []
+    closed = False
+    x = y = start_x = start_y = 0.0
+    last_ctrl = None
+    cmd = None
+    i = 0
+
+    def flush():
+        if len(points) > 1:
+            subpaths.append((list(points), closed))
+
+    def take(n):
+        nonlocal i
+        values = [float(t) for t in tokens[i:i + n]]
+        i += n
+        return values
+
+    while i < len(tokens):
+        token = tokens[i]
+        if token.isalpha():
+            cmd = token
+            i += 1
+            if cmd in "Zz":
+                closed = True
+                flush()
+                x, y = start_x, start_y
+                points, closed = [(x, y)], False
+                last_ctrl = None
+                continue
+        elif cmd is None:
+            break
+
+        rel = cmd.islower()
+        op = cmd.upper()
+        arity = {"M": 2, "L": 2, "H": 1, "V": 1, "C": 6, "S": 4, "Q": 4, "T": 2, "A": 7}[op]
+
+        if i + arity > len(tokens) or any(t.isalpha() for t in tokens[i:i + arity]):
+            break
+        v = take(arity)
+        ox, oy = (x, y) if rel else (0.0, 0.0)
+
+        if op == "M":
+            flush()
+            x, y = v[0] + ox, v[1] + oy
+            start_x, start_y = x, y
+            points, closed = [(x, y)], False
+            # Coordonnées suivantes d'un M = L implicites
+            cmd = "l" if rel else "L"
+            last_ctrl = None
+        elif op == "L":
+            x, y = v[0] + ox, v[1] + oy
+            points.append((x, y))
+            last_ctrl = None
+        elif op == "H":
+            x = v[0] + (x if rel else 0.0)
+            points.append((x, y))
+            last_ctrl = None
+        elif op == "V":
+            y = v[0] + (y if rel else 0.0)
+            points.append((x, y))
+            last_ctrl = None
+        elif op in ("C", "S"):
+            if op == "C":
+                c1 = (v[0] + ox, v[1] + oy)
+                c2 = (v[2] + ox, v[3] + oy)
+                end = (v[4] + ox, v[5] + oy)
+            else:
+                c1 = (2 * x - last_ctrl[0], 2 * y - last_ctrl[1]) if last_ctrl else (x, y)
+                c2 = (v[0] + ox, v[1] + oy)
+                end = (v[2] + ox, v[3] + oy)
+            for step in range(1, CURVE_STEPS + 1):
+                t = step / CURVE_STEPS
+                mt = 1 - t
+                points.append((
+                    mt ** 3 * x + 3 * mt ** 2 * t * c1[0] + 3 * mt * t ** 2 * c2[0] + t ** 3 * end[0],
+                    mt ** 3 * y + 3 * mt ** 2 * t * c1[1] + 3 * mt * t ** 2 * c2[1] + t ** 3 * end[1],
+                ))
+            last_ctrl = c2
+            x, y = end
+        elif op in ("Q", "T"):
+            if op == "Q":
+                ctrl = (v[0] + ox, v[1] + oy)
+                end = (v[2] + ox, v[3] + oy)
+            else:
+                ctrl = (2 * x - last_ctrl[0], 2 * y - last_ctrl[1]) if last_ctrl else (x, y)
+                end = (v[0] + ox, v[1] + oy)
+            for step in range(1, CURVE_STEPS + 1):
+                t = step / CURVE_STEPS
+                mt = 1 - t
+                points.append((
+                    mt ** 2 * x + 2 * mt * t * ctrl[0] + t ** 2 * end[0],
+                    mt ** 2 * y + 2 * mt * t * ctrl[1] + t ** 2 * end[1],
+                ))
+            last_ctrl = ctrl
+            x, y = end
+        else:
+            # Arcs refusés en amont (_check_supported)
+            raise UnsupportedSVG("arc")
+
+    flush()
+    return subpaths
+
+
+def _shape_subpaths(tag, attrs):
+    """Sous-chemins [(points, fermé)] d'un élément de forme."""
+    if tag == "path":
+        return _path_subpaths(attrs.get("d"))
+
+    if tag == "rect":
+        x, y = _length(attrs.get("x")), _length(attrs.get("y"))
+        w, h = _length(attrs.get("width")), _length(attrs.get("height"))
+        if w <= 0 or h <= 0:
+            return []
+        return [([(x, y), (x + w, y), (x + w, y + h), (x, y + h)], True)]
+
+    if tag in ("circle", "ellipse"):
+        cx, cy = _length(attrs.get("cx")), _length(attrs.get("cy"))
+        if tag == "circle":
+            rx = ry = _length(attrs.get("r"))
+        else:
+            rx, ry = _length(attrs.get("rx")), _length(attrs.get("ry"))
+        if rx <= 0 or ry <= 0:
+            return []
+        return [(_ellipse_points(cx, cy, rx, ry), True)]
+
+    if tag == "line":
+        return [([
+            (_length(attrs.get("x1")), _length(attrs.get("y1"))),
+            (_length(attrs.get("x2")), _length(attrs.get("y2"))),
+        ], False)]
+
+    if tag in ("polyline", "polygon"):
+        nums = _numbers(attrs.get("points"))
+        points = list(zip(nums[0::2], nums[1::2]))
+        return [(points, tag == "polygon")] if len(points) > 1 else []
+
+    return []
+
+
+def _paint(canvas, color, opacity, mask):
+    """Applique une couleur sur le canvas RGBA à travers un masque L."""
+    if opacity < 1:
+        mask = mask.point(lambda v: int(v * opacity))
+    layer = Image.new("RGBA", canvas.size, color + (0,))
+    layer.putalpha(mask)
+    canvas.alpha_composite(layer)
+
+
+def _fill_mask(size, subpaths, rule="nonzero"):
+    """
+    Masque L du remplissage des sous-chemins (fermés implicitement), par
+    balayage des lignes de pixels (centres) :
+    - nonzero : intérieur si la somme des sens des arêtes croisées ≠ 0
+      (sous-chemins qui se chevauchent → union)
+    - evenodd : intérieur si le nombre d'arêtes croisées est impair
+    """
+    width, height = size
+    rows = [[] for _ in range(height)]
+
+    for points, _ in subpaths:
+        if len(points) < 3:
+            continue
+        for (x0, y0), (x1, y1) in zip(points, points[1:] + points[:1]):
+            if y0 == y1:
+                continue
+            direction = 1 if y1 > y0 else -1
+            top, bottom = min(y0, y1), max(y0, y1)
+            first = max(0, math.ceil(top - 0.5))
+            last = min(height, math.ceil(bottom - 0.5))
+            slope = (x1 - x0) / (y1 - y0)
+            for row in range(first, last):
+                rows[row].append((x0 + (row + 0.5 - y0) * slope, direction))
+
+    mask = bytearray(width * height)
+
+    for row, crossings in enumerate(rows):
+        crossings.sort()
+        winding = 0
+        for (x, direction), (next_x, _) in zip(crossings, crossings[1:]):
+            winding += direction
+            inside = winding % 2 if rule == "evenodd" else winding
+            if not inside:
+                continue
+            start = max(0, math.ceil(x - 0.5))
+            end = min(width, math.ceil(next_x - 0.5))
+            if end > start:
+                offset = row * width
+                mask[offset + start:offset + end] = b"\xff" * (end - start)
+
+    return Image.frombytes("L", size, bytes(mask))
+
+
+SHAPES = {"path", "rect", "circle", "ellipse", "line", "polyline", "polygon"}
+SKIPPED = {"defs", "title", "desc", "metadata"}
+
+
+def _render_node(canvas, elem, matrix, inherited):
+    tag = _local(elem.tag)
+    if tag in SKIPPED:
+        return
+
+    attrs = _attributes(elem)
+    if attrs.get("display") == "none" or attrs.get("visibility") == "hidden":
+        return
+
+    style = dict(inherited)
+    for key in ("fill", "fill-rule", "stroke", "stroke-width", "fill-opacity", "stroke-opacity"):
+        if key in attrs:
+            style[key] = attrs[key]
+    style["opacity"] = style.get("opacity", 1.0) * _length(attrs.get("opacity"), 1.0)
+
+    matrix = _multiply(matrix, _parse_transform(attrs.get("transform")))
+
+    if tag in ("svg", "g", "a", "switch"):
+        for child in elem:
+            _render_node(canvas, child, matrix, style)
+        return
+
+    if tag not in SHAPES:
+        return
+
+    subpaths = [
+        ([_apply(matrix, px, py) for px, py in points], closed)
+        for points, closed in _shape_subpaths(tag, attrs)
+    ]
+    if not subpaths:
+        return
+
+    # Remplissage selon fill-rule (nonzero par défaut, comme en SVG)
+    fill = _parse_color(style.get("fill", "black"))
+    if fill and tag not in ("line", "polyline"):
+        mask = _fill_mask(canvas.size, subpaths, style.get("fill-rule", "nonzero"))
+        _paint(canvas, fill, style["opacity"] * _length(style.get("fill-opacity"), 1.0), mask)
+
+    stroke = _parse_color(style.get("stroke"))
+    if stroke:
+        # Épaisseur transformée par l'échelle moyenne de la matrice
+        a, b, c, d, _, _ = matrix
+        width = _length(style.get("stroke-width"), 1.0) * math.sqrt(abs(a * d - b * c))
+        mask = Image.new("L", canvas.size, 0)
+        draw = ImageDraw.Draw(mask)
+        for points, closed in subpaths:
+            line = points + [points[0]] if closed else points
+            draw.line(line, fill=255, width=max(1, int(round(width))), joint="curve")
+        _paint(canvas, stroke, style["opacity"] * _length(style.get("stroke-opacity"), 1.0), mask)
+
+
+def _rasterize_basic(svg_bytes, size):
+    root = ET.fromstring(svg_bytes)
+    if _local(root.tag) != "svg":
+        return None
+
+    try:
+        _check_supported(root)
+    except UnsupportedSVG:
+        return None
+
+    vb_x, vb_y, vb_w, vb_h = _viewbox(root)
+    out_w, out_h = _fit(size, vb_w, vb_h)
+
+    big = (out_w * SUPERSAMPLE, out_h * SUPERSAMPLE)
+    scale = big[0] / vb_w
+    canvas = Image.new("RGBA", big, (0, 0, 0, 0))
+
+    # viewBox → pixels suréchantillonnés
+    matrix = (scale, 0.0, 0.0, big[1] / vb_h, -vb_x * scale, -vb_y * big[1] / vb_h)
+    _render_node(canvas, root, matrix, {"fill": "black"})
+
+    return canvas.resize((out_w, out_h), Image.LANCZOS)
+
+
+# Ordre par défaut : cairosvg si installé, puis le repli pur Python
+register_rasterizer(_rasterize_basic, first=False)
+if cairosvg is not None:
+    register_rasterizer(_rasterize_cairosvg)
@@ -0,0 +1,90 @@
+import time
+import threading
+import unittest
+
+from src.pipeline import Pipeline, PipelineError, Stage
+
+# Au-delà : le pipeline est considéré comme bloqué
+TIMEOUT = 30
+
+
+def run_with_timeout(pipeline, items):
+    """run() dans un thread : un interblocage fait échouer le test au lieu de le figer."""
+    result = {}
+
+    def target():
+        try:
+            result["outputs"] = pipeline.run(items)
+        except Exception as e:
+            result["error"] = e
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(TIMEOUT)
+
+    if thread.is_alive():
+        raise AssertionError(f"Pipeline bloqué après {TIMEOUT}s :\n{pipeline.report()}")
+    if "error" in result:
+        raise result["error"]
+    return result["outputs"]
+
+
+class PipelineTest(unittest.TestCase):
+
+    def test_more_items_than_queue_capacity(self):
+        # Mêmes étages que run_day : fanout (mise en page) puis rendu et upload
+        # multi-workers, avec bien plus d'éléments que les files n'en contiennent
+        queue_size = 2
+        workers = 2
+        pages_per_item = 3
+        items = list(range(4 * queue_size + workers))
+
+        def layout(item):
+            for n in range(pages_per_item):
+                yield item * pages_per_item + n
+
+        def flush():
+            yield -1
+
+        def render(page):
+            time.sleep(0.001)
+            return page * 10
+
+        def upload(page):
+            time.sleep(0.002)
+            return page + 1
+
+        pipeline = Pipeline([
+            Stage("layout", layout, fanout=True, flush=flush),
+            Stage("render", render, workers=workers),
+            Stage("upload", upload, workers=workers + 1),
+        ], queue_size=queue_size)
+
+        outputs = run_with_timeout(pipeline, items)
+
+        pages = list(range(len(items) * pages_per_item)) + [-1]
+        self.assertEqual(outputs, [page * 10 + 1 for page in pages])
+        self.assertGreater(len(pages), 2 * queue_size + workers)
+
+        stats = pipeline.stats()
+        self.assertEqual(stats["upload"]["items_in"], len(pages))
+
+    def test_stage_error_aborts_pipeline(self):
+        def fail(item):
+            if item == 5:
+                raise ValueError("page 5")
+            return item
+
+        pipeline = Pipeline([
+            Stage("render", fail, workers=2),
+            Stage("upload", lambda item: item, workers=2),
+        ], queue_size=1)
+
+        with self.assertRaises(PipelineError) as ctx:
+            run_with_timeout(pipeline, range(50))
+
+        self.assertIsInstance(ctx.exception.__cause__, ValueError)
+
+
+if __name__ == "__main__":
+    unittest.main()